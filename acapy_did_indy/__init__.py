@@ -1,11 +1,16 @@
 """did:indy support."""
 from acapy_agent.config.injection_context import InjectionContext
+from acapy_agent.core.event_bus import Event, EventBus
+from acapy_agent.core.profile import Profile
+from acapy_agent.core.util import SHUTDOWN_EVENT_PATTERN, STARTUP_EVENT_PATTERN
 from acapy_agent.wallet.did_method import DIDMethods
 from acapy_agent.resolver.did_resolver import DIDResolver
 
 from .did import INDY
+from .jobs import RegistrationJobs
 from .registrar import IndyRegistrar
 from .resolver import IndyResolver
+from .tenants import wallet_id_of
 
 async def setup(context: InjectionContext):
     methods = context.inject(DIDMethods)
@@ -15,4 +20,38 @@ async def setup(context: InjectionContext):
     await indy_resolver.setup(context)
     resolver = context.inject(DIDResolver)
     resolver.register_resolver(indy_resolver)
-    context.injector.bind_instance(IndyRegistrar, IndyRegistrar(context.settings))
+    context.injector.bind_instance(IndyResolver, indy_resolver)
+    registrar = IndyRegistrar(context.settings)
+    context.injector.bind_instance(IndyRegistrar, registrar)
+    context.injector.bind_instance(RegistrationJobs, RegistrationJobs(registrar))
+
+    event_bus = context.inject(EventBus)
+    registrar.subscribe(event_bus)
+    registrar.endorsements.subscribe(event_bus)
+    event_bus.subscribe(STARTUP_EVENT_PATTERN, on_startup)
+    event_bus.subscribe(SHUTDOWN_EVENT_PATTERN, on_shutdown)
+
+
+async def on_startup(profile: Profile, event: Event):
+    """Start background tasks."""
+    indy_resolver = profile.inject(IndyResolver)
+    if indy_resolver.health:
+        indy_resolver.health.start()
+    if indy_resolver.storage_cache:
+        indy_resolver.storage_cache.profile = profile
+    registrar = profile.inject(IndyRegistrar)
+    registrar.keys.refill(profile)
+    registrar.tenants.root_profile = profile
+
+    jobs = profile.inject(RegistrationJobs)
+    for tenant in [profile, *await registrar.tenants.profiles()]:
+        pending = await jobs.resume(tenant) + await registrar.outbox.resume(tenant)
+        if tenant is not profile and not pending:
+            await registrar.tenants.unmark(wallet_id_of(tenant))
+
+
+async def on_shutdown(profile: Profile, event: Event):
+    """Stop background tasks."""
+    indy_resolver = profile.inject(IndyResolver)
+    if indy_resolver.health:
+        await indy_resolver.health.stop()
@@ -0,0 +1,257 @@
+"""In-process cache for resolved did:indy documents."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.core.profile import Profile
+from acapy_agent.storage.base import BaseStorage
+from acapy_agent.storage.error import (
+    StorageDuplicateError,
+    StorageError,
+    StorageNotFoundError,
+)
+from acapy_agent.storage.record import StorageRecord
+
+from .config import get_int
+
+LOGGER = logging.getLogger(__name__)
+
+RESOLUTION_RECORD_TYPE = "did_indy_resolution"
+
+
+@dataclass
+class CacheEntry:
+    """Cached resolution result.
+
+    A document of None records a negative (not found) result.
+    """
+
+    document: Optional[dict]
+    expires: float
+
+    @property
+    def found(self) -> bool:
+        """Return whether this entry records a resolved document."""
+        return self.document is not None
+
+
+class ResolutionCache:
+    """Bounded TTL + LRU cache of resolution results keyed by DID.
+
+    Resolved documents may be served for up to max_stale seconds past their
+    expiry; such entries are reported as stale so the caller can revalidate.
+    Not found results are never served stale.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        negative_ttl: float = 30,
+        max_entries: int = 1024,
+        max_stale: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        A max_entries of 0 disables caching.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._clock = clock
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ResolutionCache":
+        """Create a cache from plugin settings."""
+        return cls(
+            ttl=get_int(settings, "cache_ttl", 300),
+            negative_ttl=get_int(settings, "cache_negative_ttl", 30),
+            max_entries=get_int(settings, "cache_max_entries", 1024),
+            max_stale=(
+                get_int(settings, "cache_max_stale", 3600)
+                if settings.get_bool("stale_while_revalidate")
+                else 0
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether the cache stores anything."""
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def get(self, did: str) -> Optional[CacheEntry]:
+        """Return the unexpired or servable stale entry for did, if any."""
+        entry = self._entries.get(did)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        now = self._clock()
+        if entry.expires <= now:
+            if not entry.found or entry.expires + self.max_stale <= now:
+                del self._entries[did]
+                self.misses += 1
+                return None
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+        self._entries.move_to_end(did)
+        return entry
+
+    def is_stale(self, entry: CacheEntry) -> bool:
+        """Return whether entry is past its expiry."""
+        return entry.expires <= self._clock()
+
+    def put(self, did: str, document: dict):
+        """Cache a resolved document."""
+        self._store(did, CacheEntry(document, self._clock() + self.ttl))
+
+    def put_not_found(self, did: str):
+        """Cache a not found result."""
+        self._store(did, CacheEntry(None, self._clock() + self.negative_ttl))
+
+    def _store(self, did: str, entry: CacheEntry):
+        if not self.enabled:
+            return
+
+        self._entries[did] = entry
+        self._entries.move_to_end(did)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, did: str):
+        """Drop any cached entry for did."""
+        self._entries.pop(did, None)
+
+    def clear(self):
+        """Drop all cached entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+class StorageResolutionCache:
+    """Second level cache of resolved documents kept in ACA-Py storage.
+
+    Records are keyed by DID and hold the serialized document with the ledger
+    seqNo and txnTime it was resolved at and a wall clock expiry, so agents
+    sharing a storage backend share entries across restarts. Storage errors
+    are logged and treated as misses.
+    """
+
+    def __init__(self, ttl: float = 3600, clock: Callable[[], float] = time.time):
+        """Initialize the cache; it stays inactive until a profile is set."""
+        self.ttl = ttl
+        self.profile: Optional[Profile] = None
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["StorageResolutionCache"]:
+        """Create a cache from plugin settings, if enabled."""
+        if not settings.get_bool("persistent_cache"):
+            return None
+        return cls(ttl=get_int(settings, "persistent_cache_ttl", 3600))
+
+    async def get(self, did: str) -> Optional[dict]:
+        """Return the unexpired document stored for did, if any."""
+        if not self.profile:
+            return None
+
+        try:
+            async with self.profile.session() as session:
+                storage = session.inject(BaseStorage)
+                try:
+                    record = await storage.get_record(RESOLUTION_RECORD_TYPE, did)
+                except StorageNotFoundError:
+                    self.misses += 1
+                    return None
+
+                value = json.loads(record.value)
+                if value["expires"] <= self._clock():
+                    await storage.delete_record(record)
+                    self.misses += 1
+                    return None
+        except StorageError:
+            LOGGER.warning("Could not read cached resolution of %s", did, exc_info=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value["document"]
+
+    async def put(
+        self,
+        did: str,
+        document: dict,
+        seq_no: Optional[int] = None,
+        txn_time: Optional[int] = None,
+    ):
+        """Store a resolved document."""
+        if not self.profile:
+            return
+
+        value = json.dumps(
+            {
+                "document": document,
+                "seq_no": seq_no,
+                "txn_time": txn_time,
+                "expires": self._clock() + self.ttl,
+            }
+        )
+        record = StorageRecord(RESOLUTION_RECORD_TYPE, value, id=did)
+        try:
+            async with self.profile.session() as session:
+                storage = session.inject(BaseStorage)
+                try:
+                    await storage.update_record(record, value, {})
+                except StorageNotFoundError:
+                    try:
+                        await storage.add_record(record)
+                    except StorageDuplicateError:
+                        pass
+        except StorageError:
+            LOGGER.warning("Could not store resolution of %s", did, exc_info=True)
+
+    async def invalidate(self, did: str):
+        """Delete any stored document for did."""
+        if not self.profile:
+            return
+
+        try:
+            async with self.profile.session() as session:
+                storage = session.inject(BaseStorage)
+                record = await storage.get_record(RESOLUTION_RECORD_TYPE, did)
+                await storage.delete_record(record)
+        except StorageNotFoundError:
+            pass
+        except StorageError:
+            LOGGER.warning("Could not delete resolution of %s", did, exc_info=True)
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,19 @@
+"""Plugin settings helpers."""
+
+from acapy_agent.config.base import BaseSettings
+
+
+def get_int(settings: BaseSettings, name: str, default: int) -> int:
+    """Return an integer setting, or default if it is not set.
+
+    BaseSettings.get_int passes its default on as another setting name, so an
+    unset value is returned as None rather than the default.
+    """
+    value = settings.get_int(name)
+    return default if value is None else value
+
+
+def get_float(settings: BaseSettings, name: str, default: float) -> float:
+    """Return a float setting, or default if it is not set."""
+    value = settings.get_value(name)
+    return default if value is None else float(value)
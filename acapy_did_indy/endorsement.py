@@ -0,0 +1,207 @@
+"""Batched endorsement of author signed ledger transactions."""
+
+import asyncio
+import json
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.connections.models.conn_record import ConnRecord
+from acapy_agent.core.error import BaseError
+from acapy_agent.core.event_bus import Event, EventBus
+from acapy_agent.core.profile import Profile
+from acapy_agent.ledger.base import BaseLedger
+from acapy_agent.messaging.responder import BaseResponder
+from acapy_agent.protocols.endorse_transaction.v1_0.manager import TransactionManager
+from acapy_agent.protocols.endorse_transaction.v1_0.messages.transaction_acknowledgement import (
+    TransactionAcknowledgement,
+)
+from acapy_agent.protocols.endorse_transaction.v1_0.models.transaction_record import (
+    TransactionRecord,
+)
+from acapy_agent.protocols.endorse_transaction.v1_0.util import (
+    get_endorser_connection_id,
+    is_author_role,
+)
+
+from .config import get_int
+
+TRANSACTION_EVENT_PATTERN = re.compile(
+    f"^acapy::record::{TransactionRecord.RECORD_TOPIC}::.*$"
+)
+
+
+class EndorsementError(BaseError):
+    """Raised when a transaction is not endorsed and written."""
+
+
+async def endorser_connection_for(profile: Profile) -> Optional[str]:
+    """Return the endorser connection id to use if profile is an author.
+
+    Authors with endorser.auto_write and endorser.auto_promote_author_did both
+    set are refused: ACA-Py would write each endorsed NYM itself and promote
+    every registered nym to public DID in turn.
+    """
+    if not is_author_role(profile):
+        return None
+    settings = profile.settings
+    if settings.get_value("endorser.auto_write") and settings.get_value(
+        "endorser.auto_promote_author_did"
+    ):
+        raise EndorsementError(
+            "Cannot register did:indy with both endorser auto write and "
+            "auto promote author DID set"
+        )
+    connection_id = await get_endorser_connection_id(profile)
+    if not connection_id:
+        raise EndorsementError("Author role is set but no endorser connection found")
+    return connection_id
+
+
+async def endorser_did_for(profile: Profile, connection_id: str) -> str:
+    """Return the DID of the endorser on a connection."""
+    async with profile.session() as session:
+        connection = await ConnRecord.retrieve_by_id(session, connection_id)
+        endorser_info = await connection.metadata_get(session, "endorser_info")
+    if not endorser_info or not endorser_info.get("endorser_did"):
+        raise EndorsementError(f"No endorser DID known for connection {connection_id}")
+    return endorser_info["endorser_did"]
+
+
+class EndorsementTracker:
+    """Send author signed transactions to an endorser and write them once endorsed.
+
+    Endorsement outcomes are tracked from transaction record events rather than
+    by polling storage.
+    """
+
+    def __init__(self, timeout: float = 300, concurrency: int = 10):
+        """Initialize the tracker."""
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._waiting: Dict[str, Tuple[asyncio.Future, str]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "EndorsementTracker":
+        """Create a tracker from plugin settings."""
+        return cls(
+            timeout=get_int(settings, "endorsement_timeout", 300),
+            concurrency=get_int(settings, "registration_concurrency", 10),
+        )
+
+    def subscribe(self, event_bus: EventBus):
+        """Listen for transaction record state changes."""
+        event_bus.subscribe(TRANSACTION_EVENT_PATTERN, self._on_transaction_event)
+
+    async def _on_transaction_event(self, profile: Profile, event: Event):
+        """Resolve the waiter for a transaction reaching its awaited state."""
+        payload = event.payload or {}
+        waiting = self._waiting.get(payload.get("transaction_id"))
+        if not waiting or waiting[0].done():
+            return
+
+        waiter, awaited_state = waiting
+        state = payload.get("state")
+        if state == awaited_state:
+            waiter.set_result(state)
+        elif state == TransactionRecord.STATE_TRANSACTION_REFUSED:
+            waiter.set_exception(EndorsementError("Endorser refused transaction"))
+
+    async def _write(
+        self, profile: Profile, connection_id: str, record: TransactionRecord
+    ):
+        """Write an endorsed transaction, mark it acked and acknowledge it.
+
+        Unlike TransactionManager.complete_transaction, ACA-Py's post-processing
+        of the written transaction is skipped: with endorser.auto_promote_author_did
+        set, it would make each registered nym the wallet's public DID in turn.
+        """
+        base_ledger = profile.inject(BaseLedger)
+        async with base_ledger:
+            response = await base_ledger.txn_submit(
+                record.messages_attach[0]["data"]["json"], sign=False, taa_accept=False
+            )
+
+        async with profile.session() as session:
+            record.state = TransactionRecord.STATE_TRANSACTION_ACKED
+            await record.save(session, reason="Completed transaction")
+
+        ack = TransactionAcknowledgement(
+            thread_id=record.transaction_id, ledger_response=json.loads(response)
+        )
+        await profile.inject(BaseResponder).send(ack, connection_id=connection_id)
+
+    async def endorse_all(
+        self, profile: Profile, connection_id: str, transactions: Sequence[str]
+    ) -> List[Optional[Exception]]:
+        """Endorse and write author signed transactions in bulk.
+
+        Endorsement requests for every transaction are sent to the endorser
+        before awaiting any response. Endorsed transactions are then written
+        concurrently, unless the agent writes them itself on endorsement
+        (endorser.auto_write), in which case their acknowledgement is awaited.
+        Transactions written here are not post-processed by ACA-Py, so they do
+        not change the wallet's public DID. Returns None or the error for each
+        transaction.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        auto_write = bool(profile.settings.get_value("endorser.auto_write"))
+        awaited_state = (
+            TransactionRecord.STATE_TRANSACTION_ACKED
+            if auto_write
+            else TransactionRecord.STATE_TRANSACTION_ENDORSED
+        )
+
+        async def _request(transaction: str) -> str:
+            async with semaphore:
+                manager = TransactionManager(profile)
+                record = await manager.create_record(
+                    messages_attach=transaction, connection_id=connection_id
+                )
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiting[record.transaction_id] = (waiter, awaited_state)
+                try:
+                    record, request = await manager.create_request(record)
+                    await profile.inject(BaseResponder).send(
+                        request, connection_id=connection_id
+                    )
+                except Exception:
+                    del self._waiting[record.transaction_id]
+                    raise
+                return record.transaction_id
+
+        async def _complete(transaction_id: str) -> Optional[Exception]:
+            waiter, _ = self._waiting[transaction_id]
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await waiter
+                if auto_write:
+                    return None
+
+                async with semaphore:
+                    async with profile.session() as session:
+                        record = await TransactionRecord.retrieve_by_id(
+                            session, transaction_id
+                        )
+                    await self._write(profile, connection_id, record)
+                return None
+            except TimeoutError:
+                return EndorsementError(f"Transaction {transaction_id} not endorsed in time")
+            except Exception as error:
+                return error
+            finally:
+                self._waiting.pop(transaction_id, None)
+
+        requested = await asyncio.gather(
+            *(_request(transaction) for transaction in transactions),
+            return_exceptions=True,
+        )
+        completed = iter(
+            await asyncio.gather(
+                *(_complete(result) for result in requested if isinstance(result, str))
+            )
+        )
+        return [
+            next(completed) if isinstance(result, str) else result
+            for result in requested
+        ]
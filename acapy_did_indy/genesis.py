@@ -0,0 +1,107 @@
+"""On-disk cache of genesis transactions."""
+
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Callable, Optional
+
+from acapy_agent.config.ledger import fetch_genesis_transactions
+from acapy_agent.config.settings import Settings
+
+from .config import get_int
+
+LOGGER = logging.getLogger(__name__)
+
+
+def fingerprint(transactions: str) -> str:
+    """Return the content hash of genesis transactions."""
+    return sha256(transactions.encode()).hexdigest()
+
+
+@dataclass
+class GenesisEntry:
+    """Cached genesis transactions for a url."""
+
+    url: str
+    fingerprint: str
+    fetched_at: float
+    transactions: str
+
+
+class GenesisCache:
+    """Genesis transactions cached in a directory, one file per genesis url."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_age: float = 86400,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache."""
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self._clock = clock
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["GenesisCache"]:
+        """Create a cache from plugin settings, if a directory is configured."""
+        directory = settings.get_str("genesis_cache_dir")
+        if not directory:
+            return None
+        return cls(directory, max_age=get_int(settings, "genesis_cache_max_age", 86400))
+
+    def path_for(self, url: str) -> Path:
+        """Return the cache file path for url."""
+        return self.directory / f"{sha256(url.encode()).hexdigest()}.json"
+
+    def load(self, url: str) -> Optional[GenesisEntry]:
+        """Load the cached entry for url.
+
+        Entries that cannot be read or whose content does not match the stored
+        fingerprint are ignored.
+        """
+        try:
+            entry = GenesisEntry(**json.loads(self.path_for(url).read_text()))
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError):
+            LOGGER.warning("Ignoring unreadable genesis cache entry for %s", url)
+            return None
+
+        if entry.url != url or fingerprint(entry.transactions) != entry.fingerprint:
+            LOGGER.warning("Ignoring corrupt genesis cache entry for %s", url)
+            return None
+        return entry
+
+    def store(self, url: str, transactions: str) -> GenesisEntry:
+        """Write transactions for url to the cache."""
+        entry = GenesisEntry(
+            url=url,
+            fingerprint=fingerprint(transactions),
+            fetched_at=self._clock(),
+            transactions=transactions,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(url)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(entry)))
+        os.replace(tmp, path)
+        return entry
+
+    def is_stale(self, entry: GenesisEntry) -> bool:
+        """Return whether entry is older than the max age."""
+        return self._clock() - entry.fetched_at > self.max_age
+
+    async def fetch(self, url: str) -> GenesisEntry:
+        """Fetch transactions for url and store them in the cache."""
+        transactions = await fetch_genesis_transactions(url)
+        return self.store(url, transactions)
+
+    async def refresh(self, url: str, entry: GenesisEntry) -> Optional[GenesisEntry]:
+        """Fetch transactions for url; return the fresh entry if it differs."""
+        fresh = await self.fetch(url)
+        return fresh if fresh.fingerprint != entry.fingerprint else None
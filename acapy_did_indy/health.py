@@ -0,0 +1,156 @@
+"""Periodic refresh and health checks of ledger pools."""
+
+import asyncio
+from dataclasses import asdict, dataclass
+import logging
+import time
+from typing import Dict, Optional
+
+from acapy_agent.config.settings import Settings
+from indy_vdr import ledger
+
+from .config import get_int
+from .metrics import MetricsRegistry
+from .pools import LedgerPools
+
+LOGGER = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+
+
+@dataclass
+class PoolHealth:
+    """Health of one pool."""
+
+    namespace: str
+    status: str = HEALTHY
+    consecutive_failures: int = 0
+    last_checked: Optional[float] = None
+    last_rtt: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def serialize(self) -> dict:
+        """Serialize for the health route."""
+        return asdict(self)
+
+
+class PoolHealthMonitor:
+    """Refresh open pools on an interval and track their round trip times.
+
+    Pools failing degraded_after checks in a row are marked degraded until a
+    check succeeds.
+    """
+
+    def __init__(
+        self,
+        pools: LedgerPools,
+        interval: float = 600,
+        degraded_after: int = 3,
+        timeout: float = 30,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """Initialize the monitor."""
+        self.pools = pools
+        self.interval = interval
+        self.degraded_after = degraded_after
+        self.timeout = timeout
+        self.health: Dict[str, PoolHealth] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        metrics = metrics or MetricsRegistry()
+        self._rtt = metrics.histogram(
+            "acapy_did_indy_pool_rtt_seconds",
+            "Round trip time of pool health check reads",
+            ["namespace"],
+        )
+        self._degraded = metrics.gauge(
+            "acapy_did_indy_pool_degraded",
+            "Whether a pool is marked degraded",
+            ["namespace"],
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        pools: LedgerPools,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> "PoolHealthMonitor":
+        """Create a monitor from plugin settings."""
+        return cls(
+            pools,
+            interval=get_int(settings, "pool_refresh_interval", 600),
+            degraded_after=get_int(settings, "pool_degraded_after", 3),
+            timeout=get_int(settings, "pool_check_timeout", 30),
+            metrics=metrics,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Return whether the monitor loop is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the monitor loop; an interval of 0 disables monitoring."""
+        if self.interval > 0 and not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the monitor loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check_all()
+
+    async def check_all(self) -> Dict[str, PoolHealth]:
+        """Refresh and check every open pool concurrently."""
+        await asyncio.gather(
+            *(self.check(namespace) for namespace in list(self.pools.pools))
+        )
+        return self.health
+
+    async def check(self, namespace: str) -> PoolHealth:
+        """Refresh the pool for namespace and time a read against it."""
+        health = self.health.setdefault(namespace, PoolHealth(namespace))
+        pool = self.pools.pools[namespace]
+        try:
+            async with asyncio.timeout(self.timeout):
+                await pool.refresh()
+                start = time.perf_counter()
+                await pool.submit_request(ledger.build_get_txn_request(None, 1, 1))
+                rtt = time.perf_counter() - start
+        except Exception as error:
+            health.consecutive_failures += 1
+            health.last_error = str(error) or type(error).__name__
+            if health.consecutive_failures >= self.degraded_after:
+                if health.status != DEGRADED:
+                    LOGGER.warning("Pool for %s is degraded: %s", namespace, error)
+                health.status = DEGRADED
+        else:
+            if health.status == DEGRADED:
+                LOGGER.info("Pool for %s recovered", namespace)
+            health.status = HEALTHY
+            health.consecutive_failures = 0
+            health.last_error = None
+            health.last_rtt = rtt
+            self._rtt.observe(namespace, value=rtt)
+
+        health.last_checked = time.time()
+        self._degraded.set(namespace, value=int(health.status == DEGRADED))
+        return health
+
+    def report(self) -> Dict[str, dict]:
+        """Return the health of every open pool."""
+        return {
+            namespace: self.health.get(namespace, PoolHealth(namespace)).serialize()
+            for namespace in self.pools.pools
+        }
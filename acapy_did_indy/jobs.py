@@ -0,0 +1,220 @@
+"""Background did:indy registration jobs."""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+from acapy_agent.core.profile import Profile
+from acapy_agent.messaging.models.base_record import BaseRecord, BaseRecordSchema
+from acapy_agent.protocols.coordinate_mediation.v1_0.models.mediation_record import (
+    MediationRecord,
+)
+from acapy_agent.protocols.coordinate_mediation.v1_0.route_manager import (
+    RouteManager,
+)
+from marshmallow import EXCLUDE, fields
+
+from .registrar import IndyRegistrar
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RegistrationJobRecord(BaseRecord):
+    """Persisted state of a background did:indy registration.
+
+    Saving the record emits a did_indy_registration webhook on each state change.
+    """
+
+    class Meta:
+        """Registration job metadata."""
+
+        schema_class = "RegistrationJobRecordSchema"
+
+    RECORD_TYPE = "did_indy_registration_job"
+    RECORD_ID_NAME = "job_id"
+    RECORD_TOPIC = "did_indy_registration"
+    TAG_NAMES = {"state"}
+
+    STATE_PENDING = "pending"
+    STATE_COMPLETED = "completed"
+    STATE_FAILED = "failed"
+
+    def __init__(
+        self,
+        *,
+        job_id: Optional[str] = None,
+        state: Optional[str] = None,
+        nym: Optional[str] = None,
+        didcomm: bool = True,
+        ldp_vc: bool = False,
+        mediation_id: Optional[str] = None,
+        did: Optional[str] = None,
+        write_id: Optional[str] = None,
+        error: Optional[str] = None,
+        **kwargs,
+    ):
+        """Initialize the record."""
+        super().__init__(job_id, state or self.STATE_PENDING, **kwargs)
+        self.nym = nym
+        self.didcomm = didcomm
+        self.ldp_vc = ldp_vc
+        self.mediation_id = mediation_id
+        self.did = did
+        self.write_id = write_id
+        self.error = error
+
+    @property
+    def job_id(self) -> str:
+        """Return the job id."""
+        return self._id
+
+    @property
+    def record_value(self) -> dict:
+        """Return record value."""
+        return {
+            prop: getattr(self, prop)
+            for prop in (
+                "nym",
+                "didcomm",
+                "ldp_vc",
+                "mediation_id",
+                "did",
+                "write_id",
+                "error",
+            )
+        }
+
+
+class RegistrationJobRecordSchema(BaseRecordSchema):
+    """Registration job record schema."""
+
+    class Meta:
+        """Registration job record schema metadata."""
+
+        model_class = RegistrationJobRecord
+        unknown = EXCLUDE
+
+    job_id = fields.Str(required=False, metadata={"description": "Job identifier"})
+    nym = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Nym the did:indy is based on; public DID if unset"},
+    )
+    didcomm = fields.Bool(
+        required=False, metadata={"description": "Support DIDComm with this DID"}
+    )
+    ldp_vc = fields.Bool(
+        required=False, metadata={"description": "Support LDP-VC issuance with this DID"}
+    )
+    mediation_id = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Mediation record ID to be used in DIDComm service"},
+    )
+    did = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "The created did:indy once completed"},
+    )
+    write_id = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={
+            "description": (
+                "Set if the ledger write is queued for retry; see "
+                "/did/indy/ledger-writes"
+            )
+        },
+    )
+    error = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Why registration failed"},
+    )
+
+
+class RegistrationJobs:
+    """Run did:indy registrations in the background."""
+
+    def __init__(self, registrar: IndyRegistrar):
+        """Initialize the job runner."""
+        self.registrar = registrar
+        self._semaphore = asyncio.Semaphore(registrar.write_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        profile: Profile,
+        nym: Optional[str],
+        *,
+        didcomm: bool = True,
+        ldp_vc: bool = False,
+        mediation_id: Optional[str] = None,
+    ) -> RegistrationJobRecord:
+        """Persist a registration job and start it in the background."""
+        job = RegistrationJobRecord(
+            nym=nym, didcomm=didcomm, ldp_vc=ldp_vc, mediation_id=mediation_id
+        )
+        async with profile.session() as session:
+            await job.save(session, reason="Created did:indy registration job")
+
+        await self.registrar.tenants.mark(profile)
+        self._spawn(profile, job.job_id)
+        return job
+
+    async def resume(self, profile: Profile) -> int:
+        """Restart jobs left pending, such as by an agent restart; return how many."""
+        async with profile.session() as session:
+            pending = await RegistrationJobRecord.query(
+                session, {"state": RegistrationJobRecord.STATE_PENDING}
+            )
+        for job in pending:
+            self._spawn(profile, job.job_id)
+        return len(pending)
+
+    def _spawn(self, profile: Profile, job_id: str):
+        task = asyncio.ensure_future(self._run(profile, job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, profile: Profile, job_id: str):
+        """Perform the registration for a job and record the outcome."""
+        async with self._semaphore:
+            async with profile.session() as session:
+                job = await RegistrationJobRecord.retrieve_by_id(session, job_id)
+
+            try:
+                mediation_record = await self._mediation_record(profile, job)
+                did_info = await self.registrar.from_public_nym(
+                    profile,
+                    job.nym,
+                    didcomm=job.didcomm,
+                    ldp_vc=job.ldp_vc,
+                    mediation_records=[mediation_record] if mediation_record else None,
+                )
+            except Exception as error:
+                LOGGER.exception("did:indy registration job %s failed", job_id)
+                job.state = RegistrationJobRecord.STATE_FAILED
+                job.error = str(error) or type(error).__name__
+            else:
+                job.state = RegistrationJobRecord.STATE_COMPLETED
+                job.did = did_info.did
+                pending = await self.registrar.outbox.pending_writes(
+                    profile, [did_info.did]
+                )
+                if did_info.did in pending:
+                    job.write_id = pending[did_info.did].write_id
+
+            async with profile.session() as session:
+                await job.save(session, reason="Finished did:indy registration job")
+
+    async def _mediation_record(
+        self, profile: Profile, job: RegistrationJobRecord
+    ) -> Optional[MediationRecord]:
+        """Return the mediation record to use for a job."""
+        route_manager = profile.inject(RouteManager)
+        return await route_manager.mediation_record_if_id(
+            profile=profile,
+            mediation_id=job.mediation_id,
+            or_default=job.didcomm,
+        )
@@ -0,0 +1,148 @@
+"""Pool of pre-generated LDP-VC assertion keys."""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import logging
+from typing import Deque, Dict, Optional
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.core.profile import Profile, ProfileSession
+from acapy_agent.storage.base import BaseStorage
+from acapy_agent.storage.error import StorageNotFoundError
+from acapy_agent.storage.record import StorageRecord
+from acapy_agent.utils.multiformats import multibase, multicodec
+from acapy_agent.wallet.base import BaseWallet
+from acapy_agent.wallet.key_type import ED25519
+import base58
+
+from .config import get_int
+
+LOGGER = logging.getLogger(__name__)
+
+POOLED_KEY_RECORD_TYPE = "did_indy_pooled_key"
+
+
+def public_key_multibase(verkey: str) -> str:
+    """Return the Ed25519VerificationKey2020 multibase encoding of a verkey."""
+    return multibase.encode(
+        multicodec.wrap("ed25519-pub", base58.b58decode(verkey)), "base58btc"
+    )
+
+
+@dataclass(frozen=True)
+class PooledKey:
+    """An ED25519 key in the wallet awaiting a kid."""
+
+    verkey: str
+    public_key_multibase: str
+
+
+class KeyPool:
+    """Keep pre-generated ED25519 keys per wallet so registration need not create them.
+
+    Keys are created in the wallet without a kid and assigned one when claimed.
+    Each pooled key is noted in a storage record, so keys left unclaimed when
+    the agent stops are loaded back into the pool when it is next refilled.
+    """
+
+    def __init__(self, size: int = 0):
+        """Initialize the pool; a size of 0 disables it."""
+        self.size = size
+        self._keys: Dict[str, Deque[PooledKey]] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        self.claimed = 0
+        self.missed = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "KeyPool":
+        """Create a pool from plugin settings."""
+        return cls(size=get_int(settings, "ldp_vc_key_pool_size", 0))
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether keys are pre-generated."""
+        return self.size > 0
+
+    def available(self, profile: Profile) -> int:
+        """Return the number of keys ready for profile's wallet."""
+        return len(self._keys.get(profile.name, ()))
+
+    async def claim(
+        self, profile: Profile, session: ProfileSession, kid: str
+    ) -> PooledKey:
+        """Assign kid to a pooled key, creating one if none is ready."""
+        wallet = session.inject(BaseWallet)
+        key = await self._take(profile, session)
+        if key:
+            self.claimed += 1
+            await wallet.assign_kid_to_key(key.verkey, kid)
+        else:
+            if self.enabled:
+                self.missed += 1
+            created = await wallet.create_key(key_type=ED25519, kid=kid)
+            key = PooledKey(created.verkey, public_key_multibase(created.verkey))
+
+        if self.enabled and self.available(profile) <= self.size // 2:
+            self.refill(profile)
+        return key
+
+    async def _take(
+        self, profile: Profile, session: ProfileSession
+    ) -> Optional[PooledKey]:
+        """Remove and return a pooled key for profile's wallet, if one is ready."""
+        keys = self._keys.get(profile.name)
+        storage = session.inject(BaseStorage)
+        while keys:
+            key = keys.popleft()
+            try:
+                await storage.delete_record(
+                    StorageRecord(POOLED_KEY_RECORD_TYPE, key.verkey, id=key.verkey)
+                )
+            except StorageNotFoundError:
+                # Claimed by another agent sharing the wallet
+                continue
+            return key
+        return None
+
+    def refill(self, profile: Profile):
+        """Top up the keys for profile's wallet in the background.
+
+        Keys left in the wallet's pool by a previous run are loaded first, even
+        when the pool is disabled, so they are claimed before new keys are made.
+        """
+        if profile.name in self._refills or (
+            not self.enabled and profile.name in self._keys
+        ):
+            return
+        task = asyncio.ensure_future(self._refill(profile))
+        self._refills[profile.name] = task
+        task.add_done_callback(lambda _: self._refills.pop(profile.name, None))
+
+    async def _refill(self, profile: Profile):
+        """Create keys until the pool for profile's wallet is full."""
+        try:
+            async with profile.session() as session:
+                storage = session.inject(BaseStorage)
+                keys = self._keys.get(profile.name)
+                if keys is None:
+                    records = await storage.find_all_records(POOLED_KEY_RECORD_TYPE)
+                    keys = self._keys.setdefault(profile.name, deque())
+                    keys.extend(
+                        PooledKey(record.value, public_key_multibase(record.value))
+                        for record in records
+                    )
+
+                wallet = session.inject(BaseWallet)
+                while len(keys) < self.size:
+                    created = await wallet.create_key(key_type=ED25519)
+                    await storage.add_record(
+                        StorageRecord(
+                            POOLED_KEY_RECORD_TYPE, created.verkey, id=created.verkey
+                        )
+                    )
+                    keys.append(
+                        PooledKey(created.verkey, public_key_multibase(created.verkey))
+                    )
+        except Exception:
+            LOGGER.exception("Failed to refill LDP-VC key pool for %s", profile.name)
@@ -0,0 +1,177 @@
+"""Minimal metrics rendered in the Prometheus text format."""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        label_str = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        name = f"{name}{{{label_str}}}"
+    return f"{name} {value}"
+
+
+class Metric(ABC):
+    """Base metric with a fixed set of label names."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        """Initialize the metric."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _key(self, label_values: Sequence[str]) -> Tuple[str, ...]:
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+        return tuple(str(value) for value in label_values)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """Yield the samples of this metric."""
+
+    def render(self) -> List[str]:
+        """Render the metric in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(_format(*sample) for sample in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        """Initialize the counter."""
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        """Increment the value for the label set."""
+        key = self._key(label_values)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def set(self, *label_values: str, value: float):
+        """Set the value for the label set, such as to mirror a count kept elsewhere."""
+        self.values[self._key(label_values)] = value
+
+    def get(self, *label_values: str) -> float:
+        """Return the value for the label set."""
+        return self.values.get(self._key(label_values), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield one sample per label set."""
+        for key, value in self.values.items():
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Gauge(Counter):
+    """Value per label set that may go up and down."""
+
+    type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        """Decrement the value for the label set."""
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Distribution of observed values per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """Initialize the histogram."""
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, *label_values: str, value: float):
+        """Record an observation for the label set."""
+        key = self._key(label_values)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield cumulative bucket, sum and count samples per label set."""
+        for key, counts in self._counts.items():
+            labels = dict(zip(self.labels, key))
+            total = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                total += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield f"{self.name}_bucket", {**labels, "le": le}, total
+            yield f"{self.name}_sum", labels, self._sums[key]
+            yield f"{self.name}_count", labels, total
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric):
+        """Add a metric to the registry."""
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Register and return a counter."""
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        """Register and return a gauge."""
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register and return a histogram."""
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def on_collect(self, collector: Callable[[], None]):
+        """Register a callback that updates metrics before each render."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        for collector in self.collectors:
+            collector()
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,340 @@
+"""Durable outbox of did:indy ledger writes awaiting retry."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Sequence
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.core.profile import Profile, ProfileSession
+from acapy_agent.ledger.error import ClosedPoolError
+from acapy_agent.messaging.models.base_record import BaseRecord, BaseRecordSchema
+from indy_vdr import VdrError, VdrErrorCode
+from marshmallow import EXCLUDE, fields
+
+from .config import get_float, get_int
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LedgerWriteRecord(BaseRecord):
+    """Persisted diddocContent write that failed and is being retried or given up.
+
+    Saving the record emits a did_indy_ledger_write webhook on each change.
+    """
+
+    class Meta:
+        """Ledger write metadata."""
+
+        schema_class = "LedgerWriteRecordSchema"
+
+    RECORD_TYPE = "did_indy_ledger_write"
+    RECORD_ID_NAME = "write_id"
+    RECORD_TOPIC = "did_indy_ledger_write"
+    TAG_NAMES = {"state", "did"}
+
+    STATE_PENDING = "pending"
+    STATE_COMPLETED = "completed"
+    STATE_FAILED = "failed"
+
+    def __init__(
+        self,
+        *,
+        write_id: Optional[str] = None,
+        state: Optional[str] = None,
+        did: Optional[str] = None,
+        nym: Optional[str] = None,
+        doc_content: Optional[dict] = None,
+        write_mode: Optional[str] = None,
+        attempts: int = 0,
+        next_attempt: float = 0,
+        error: Optional[str] = None,
+        **kwargs,
+    ):
+        """Initialize the record."""
+        super().__init__(write_id, state or self.STATE_PENDING, **kwargs)
+        self.did = did
+        self.nym = nym
+        self.doc_content = doc_content or {}
+        self.write_mode = write_mode
+        self.attempts = attempts
+        self.next_attempt = next_attempt
+        self.error = error
+
+    @property
+    def write_id(self) -> str:
+        """Return the write id."""
+        return self._id
+
+    @property
+    def record_value(self) -> dict:
+        """Return record value."""
+        return {
+            prop: getattr(self, prop)
+            for prop in (
+                "nym",
+                "doc_content",
+                "write_mode",
+                "attempts",
+                "next_attempt",
+                "error",
+            )
+        }
+
+
+class LedgerWriteRecordSchema(BaseRecordSchema):
+    """Ledger write record schema."""
+
+    class Meta:
+        """Ledger write record schema metadata."""
+
+        model_class = LedgerWriteRecord
+        unknown = EXCLUDE
+
+    write_id = fields.Str(required=False, metadata={"description": "Write identifier"})
+    did = fields.Str(required=False, metadata={"description": "The did:indy written"})
+    nym = fields.Str(required=False, metadata={"description": "Nym signing the write"})
+    doc_content = fields.Dict(
+        required=False, metadata={"description": "diddocContent to write"}
+    )
+    write_mode = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={
+            "description": "nym or attrib to write only that form; unset for the "
+            "namespace's write mode"
+        },
+    )
+    attempts = fields.Int(
+        required=False, metadata={"description": "Failed attempts so far"}
+    )
+    next_attempt = fields.Float(
+        required=False, metadata={"description": "Unix time of the next attempt"}
+    )
+    error = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Error from the last failed attempt"},
+    )
+
+
+def backoff_delay(
+    attempts: int,
+    base: float,
+    maximum: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """Return the delay before retrying after attempts failures.
+
+    The delay doubles with each failure up to maximum; the upper half of it is
+    randomized so writes that failed together are not retried together.
+    """
+    delay = min(maximum, base * 2 ** max(attempts - 1, 0))
+    return delay / 2 + rand() * delay / 2
+
+
+TRANSIENT_VDR_ERRORS = {
+    VdrErrorCode.CONNECTION,
+    VdrErrorCode.UNAVAILABLE,
+    VdrErrorCode.POOL_NO_CONSENSUS,
+    VdrErrorCode.POOL_TIMEOUT,
+}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return whether a failed ledger write may succeed if retried.
+
+    Pool connection failures and timeouts, including those wrapped by ledger
+    errors, are transient; the ledger rejecting a write is not.
+    """
+    while error is not None:
+        if isinstance(error, VdrError):
+            return error.code in TRANSIENT_VDR_ERRORS
+        if isinstance(error, (ClosedPoolError, ConnectionError, TimeoutError)):
+            return True
+        error = error.__cause__
+    return False
+
+
+Publish = Callable[[Profile, LedgerWriteRecord], Awaitable[None]]
+
+
+class LedgerWriteOutbox:
+    """Retry failed ledger writes with exponential backoff until they succeed."""
+
+    def __init__(
+        self,
+        publish: Publish,
+        max_attempts: int = 10,
+        retry_delay: float = 2,
+        max_retry_delay: float = 300,
+    ):
+        """Initialize the outbox."""
+        self.publish = publish
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings, publish: Publish) -> "LedgerWriteOutbox":
+        """Create an outbox from plugin settings."""
+        return cls(
+            publish,
+            max_attempts=get_int(settings, "ledger_write_max_attempts", 10),
+            retry_delay=get_float(settings, "ledger_write_retry_delay", 2),
+            max_retry_delay=get_float(settings, "ledger_write_max_retry_delay", 300),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether failed writes are queued for retry."""
+        return self.max_attempts > 0
+
+    async def enqueue(
+        self,
+        profile: Profile,
+        did: str,
+        nym: str,
+        doc_content: dict,
+        error: Exception,
+        write_mode: Optional[str] = None,
+    ) -> LedgerWriteRecord:
+        """Persist a failed write and retry it in the background if it may succeed.
+
+        A write already pending or failed for did is replaced by the newer content
+        and its attempts restart. Writes failing with an error that is not
+        transient, or with the outbox disabled, are stored as failed.
+        """
+        async with profile.transaction() as txn:
+            existing = await LedgerWriteRecord.query(
+                txn,
+                {
+                    "did": did,
+                    "state": {
+                        "$in": [
+                            LedgerWriteRecord.STATE_PENDING,
+                            LedgerWriteRecord.STATE_FAILED,
+                        ]
+                    },
+                },
+            )
+            record = existing[0] if existing else LedgerWriteRecord(did=did)
+            if record.state == LedgerWriteRecord.STATE_FAILED:
+                record.state = LedgerWriteRecord.STATE_PENDING
+                record.attempts = 0
+            record.nym = nym
+            record.doc_content = doc_content
+            record.write_mode = write_mode
+            self._record_failure(record, error)
+            await record.save(txn, reason="Queued did:indy ledger write")
+            await txn.commit()
+
+        if record.state == LedgerWriteRecord.STATE_PENDING:
+            LOGGER.warning("Ledger write for %s failed, retrying: %s", did, record.error)
+            self._spawn(profile, record.write_id)
+        return record
+
+    async def complete(self, profile: Profile, write_id: str):
+        """Mark a failed write completed after it was written again."""
+        async with profile.transaction() as txn:
+            record = await LedgerWriteRecord.retrieve_by_id(
+                txn, write_id, for_update=True
+            )
+            record.state = LedgerWriteRecord.STATE_COMPLETED
+            record.error = None
+            await record.save(txn, reason="Completed did:indy ledger write")
+            await txn.commit()
+
+    async def failed_write(
+        self, session: ProfileSession, did: str
+    ) -> Optional[LedgerWriteRecord]:
+        """Return the write for did that was given up on, if any."""
+        failed = await LedgerWriteRecord.query(
+            session, {"did": did, "state": LedgerWriteRecord.STATE_FAILED}
+        )
+        return failed[0] if failed else None
+
+    async def resume(self, profile: Profile) -> int:
+        """Restart retries left pending, such as by an agent restart; return how many."""
+        async with profile.session() as session:
+            pending = await LedgerWriteRecord.query(
+                session, {"state": LedgerWriteRecord.STATE_PENDING}
+            )
+        for record in pending:
+            self._spawn(profile, record.write_id)
+        return len(pending)
+
+    async def pending_writes(
+        self, profile: Profile, dids: Sequence[str]
+    ) -> Dict[str, LedgerWriteRecord]:
+        """Return the write still pending for each of dids that has one."""
+        if not dids:
+            return {}
+        async with profile.session() as session:
+            pending = await LedgerWriteRecord.query(
+                session,
+                {"did": {"$in": list(dids)}, "state": LedgerWriteRecord.STATE_PENDING},
+            )
+        return {record.did: record for record in pending}
+
+    def _spawn(self, profile: Profile, write_id: str):
+        if write_id in self._tasks:
+            return
+        task = asyncio.ensure_future(self._run(profile, write_id))
+        self._tasks[write_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(write_id, None))
+
+    async def _run(self, profile: Profile, write_id: str):
+        """Retry a write until it succeeds or runs out of attempts."""
+        while True:
+            async with profile.session() as session:
+                record = await LedgerWriteRecord.retrieve_by_id(session, write_id)
+            if record.state != LedgerWriteRecord.STATE_PENDING:
+                return
+
+            await asyncio.sleep(max(0, record.next_attempt - time.time()))
+            async with profile.session() as session:
+                record = await LedgerWriteRecord.retrieve_by_id(session, write_id)
+
+            try:
+                await self.publish(profile, record)
+                error = None
+            except Exception as failure:
+                error = failure
+
+            async with profile.transaction() as txn:
+                latest = await LedgerWriteRecord.retrieve_by_id(
+                    txn, write_id, for_update=True
+                )
+                if latest.doc_content != record.doc_content:
+                    # Content was replaced while publishing; write the newer one
+                    latest.next_attempt = 0
+                elif error is None:
+                    latest.state = LedgerWriteRecord.STATE_COMPLETED
+                    latest.error = None
+                else:
+                    self._record_failure(latest, error)
+                await latest.save(txn, reason="Retried did:indy ledger write")
+                await txn.commit()
+
+    def _record_failure(self, record: LedgerWriteRecord, error: Exception):
+        """Schedule the next attempt or give up on a failed write.
+
+        Writes failing with an error that is not transient are given up on at once.
+        """
+        record.attempts += 1
+        record.error = str(error) or type(error).__name__
+        if record.attempts >= self.max_attempts or not is_transient(error):
+            LOGGER.error(
+                "Ledger write for %s failed %d times, giving up: %s",
+                record.did,
+                record.attempts,
+                record.error,
+            )
+            record.state = LedgerWriteRecord.STATE_FAILED
+        else:
+            record.next_attempt = time.time() + backoff_delay(
+                record.attempts, self.retry_delay, self.max_retry_delay
+            )
@@ -0,0 +1,100 @@
+"""Indy VDR ledger pools keyed by namespace."""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Mapping, Optional, Set
+
+from acapy_agent.config.ledger import fetch_genesis_transactions
+from indy_vdr import Pool, open_pool
+
+from .genesis import GenesisCache, GenesisEntry
+from .singleflight import SingleFlight
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LedgerPools:
+    """Open and hold indy_vdr pools for configured namespaces.
+
+    When a pool is reopened from changed genesis, on_reopen is called with the
+    namespace and the new pool.
+    """
+
+    def __init__(
+        self,
+        ledgers: Mapping[str, str],
+        genesis_cache: Optional[GenesisCache] = None,
+    ):
+        """Initialize the pools from a namespace to genesis url mapping."""
+        self.ledgers = dict(ledgers)
+        self.genesis_cache = genesis_cache
+        self.pools: Dict[str, Pool] = {}
+        self.on_reopen: Optional[Callable[[str, Pool], None]] = None
+        self._opening: SingleFlight[Pool] = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __contains__(self, namespace: str) -> bool:
+        """Return whether namespace is configured."""
+        return namespace in self.ledgers
+
+    async def open(self, namespace: str) -> Pool:
+        """Return the pool for namespace, opening it on first use."""
+        pool = self.pools.get(namespace)
+        if pool:
+            return pool
+        return await self._opening.do(namespace, lambda: self._open(namespace))
+
+    async def _open(self, namespace: str) -> Pool:
+        transactions = await self._genesis_transactions(namespace)
+        pool = await open_pool(transactions=transactions)
+        self.pools[namespace] = pool
+        return pool
+
+    async def _genesis_transactions(self, namespace: str) -> str:
+        """Return genesis transactions for namespace, preferring the cache."""
+        url = self.ledgers[namespace]
+        if not self.genesis_cache:
+            return await fetch_genesis_transactions(url)
+
+        entry = self.genesis_cache.load(url)
+        if not entry:
+            return (await self.genesis_cache.fetch(url)).transactions
+
+        if self.genesis_cache.is_stale(entry):
+            try:
+                return (await self.genesis_cache.fetch(url)).transactions
+            except Exception:
+                LOGGER.warning(
+                    "Could not refresh stale genesis for %s; using cached copy", namespace
+                )
+                return entry.transactions
+
+        self._spawn(self._refresh_genesis(namespace, entry))
+        return entry.transactions
+
+    async def _refresh_genesis(self, namespace: str, entry: GenesisEntry):
+        """Refresh cached genesis in the background, reopening the pool on change."""
+        assert self.genesis_cache
+        try:
+            fresh = await self.genesis_cache.refresh(self.ledgers[namespace], entry)
+            if fresh:
+                LOGGER.info("Genesis for %s changed; reopening pool", namespace)
+                # Wait for the first open, which may still be in flight
+                old = await self.open(namespace)
+                pool = await open_pool(transactions=fresh.transactions)
+                self.pools[namespace] = pool
+                if self.on_reopen:
+                    self.on_reopen(namespace, pool)
+                old.close()
+        except Exception:
+            LOGGER.warning("Background genesis refresh failed for %s", namespace)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def open_all(self) -> Dict[str, Pool]:
+        """Open the pools for every configured namespace concurrently."""
+        await asyncio.gather(*(self.open(namespace) for namespace in self.ledgers))
+        return self.pools
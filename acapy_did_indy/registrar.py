@@ -1,35 +1,110 @@
 """did:indy registrar."""
 
+import asyncio
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
 import json
 from os import getenv
-from typing import List
+import re
+from typing import Dict, List, Literal, Mapping, Optional, Sequence, Tuple
 
 from acapy_agent.config.settings import Settings
 from acapy_agent.core.error import BaseError
-from acapy_agent.core.profile import Profile
+from acapy_agent.core.event_bus import Event, EventBus
+from acapy_agent.core.profile import Profile, ProfileSession
 from acapy_agent.ledger.base import BaseLedger
+from acapy_agent.ledger.error import LedgerTransactionError
 from acapy_agent.protocols.coordinate_mediation.v1_0.models.mediation_record import (
     MediationRecord,
 )
 from acapy_agent.protocols.coordinate_mediation.v1_0.route_manager import (
     RouteManager,
 )
-from acapy_agent.utils.multiformats import multibase, multicodec
 from acapy_agent.wallet.base import BaseWallet
 from acapy_agent.wallet.did_info import DIDInfo
 from acapy_agent.wallet.error import WalletNotFoundError
 from acapy_agent.wallet.key_type import ED25519
-import base58
-from indy_vdr import ledger
+from indy_vdr import Request, VdrError, VdrErrorCode, ledger
 from pydid.verification_method import Ed25519VerificationKey2020
 
+from .config import get_int
 from .did import INDY
+from .endorsement import (
+    EndorsementTracker,
+    endorser_connection_for,
+    endorser_did_for,
+)
+from .keypool import KeyPool
+from .outbox import LedgerWriteOutbox, LedgerWriteRecord
+from .resolver import IndyResolver, namespace_of
+from .tenants import Tenants, wallet_id_of
+
+WriteMode = Literal["auto", "nym", "attrib", "both"]
+WRITE_MODES = ("auto", "nym", "attrib", "both")
+SERVICES_CACHE_SIZE = 256
+MEDIATION_EVENT_PATTERN = re.compile(
+    f"^acapy::record::{MediationRecord.RECORD_TOPIC}::.*$"
+)
 
 
 class IndyRegistrarError(BaseError):
     """Raised on errors in registrar."""
 
 
+def write_mode_for(
+    config: Mapping[str, WriteMode] | WriteMode | None, namespace: str
+) -> WriteMode:
+    """Return the diddocContent write mode configured for namespace.
+
+    The config is either one mode for every ledger or a mapping of namespace to
+    mode; unconfigured namespaces use "both".
+    """
+    mode = config.get(namespace) if isinstance(config, Mapping) else config
+    mode = mode or "both"
+    if mode not in WRITE_MODES:
+        raise IndyRegistrarError(
+            f"Invalid diddoc_content_write mode {mode} for {namespace}; "
+            f"expected one of {', '.join(WRITE_MODES)}"
+        )
+    return mode
+
+
+def rejects_nym_diddoc(error: Exception) -> bool:
+    """Return whether error is a ledger rejecting diddocContent on NYMs.
+
+    Ledgers predating did:indy reject the unknown NYM field with a REQNACK that
+    ACA-Py reports as a generic LedgerTransactionError raised from the VdrError.
+    """
+    cause = error
+    while cause is not None and not isinstance(cause, VdrError):
+        cause = cause.__cause__
+    if cause is None or cause.code != VdrErrorCode.POOL_REQUEST_FAILED:
+        return False
+    return "diddocContent" in f"{cause} {cause.extra or ''}"
+
+
+@dataclass
+class PreparedRegistration:
+    """A did:indy stored in the wallet and the diddocContent to publish for it.
+
+    A write_mode, if set, is used instead of the one configured for the
+    namespace. A write_id is set when publishing again a write that failed.
+    """
+
+    nym: DIDInfo
+    did_info: DIDInfo
+    doc_content: dict
+    created: bool = True
+    write_mode: Optional[WriteMode] = None
+    write_id: Optional[str] = None
+
+    @property
+    def namespace(self) -> Optional[str]:
+        """Return the namespace the did:indy is registered on."""
+        return namespace_of(self.did_info.did)
+
+
 class IndyRegistrar:
     """did:indy registrar."""
 
@@ -42,31 +117,95 @@ class IndyRegistrar:
             raise IndyRegistrarError("Namespace is not configured; cannot init registrar")
 
         self.namespace = namespace
+        self.tenant_namespaces = config.get("tenant_namespaces") or {}
+        if not isinstance(self.tenant_namespaces, Mapping):
+            raise IndyRegistrarError(
+                "tenant_namespaces must map wallet ids or names to namespaces"
+            )
+        self.write_mode_config = config.get("diddoc_content_write")
+        self.write_mode = write_mode_for(self.write_mode_config, namespace)
+        self.write_modes: Dict[str, WriteMode] = {namespace: self.write_mode}
+        self.nym_diddoc_support: Dict[str, bool] = {}
+        self.batch_size = get_int(config, "registration_batch_size", 100)
+        self.write_concurrency = get_int(config, "registration_concurrency", 10)
+        self.endorsements = EndorsementTracker.from_settings(config)
+        self.outbox = LedgerWriteOutbox.from_settings(config, self._retry)
+        self.keys = KeyPool.from_settings(config)
+        self.tenants = Tenants()
+        self._services: OrderedDict[
+            Tuple[Optional[str], Tuple[str, ...], Tuple[str, ...]], List[dict]
+        ] = OrderedDict()
+
+    def subscribe(self, event_bus: EventBus):
+        """Listen for mediation record changes."""
+        event_bus.subscribe(MEDIATION_EVENT_PATTERN, self._on_mediation_event)
 
+    async def _on_mediation_event(self, profile: Profile, event: Event):
+        """Forget memoized services, whose routing may have changed."""
+        self._services.clear()
+
+    def namespace_for(self, profile: Profile) -> str:
+        """Return the namespace new did:indy DIDs are created on for profile.
+
+        Tenants listed in tenant_namespaces by wallet id or wallet name use the
+        namespace given there; otherwise the agent's is used.
+        """
+        for wallet in (wallet_id_of(profile), profile.settings.get("wallet.name")):
+            if wallet and wallet in self.tenant_namespaces:
+                return self.tenant_namespaces[wallet]
+        return self.namespace
+
+    def write_mode_for(self, namespace: Optional[str]) -> WriteMode:
+        """Return the diddocContent write mode for namespace."""
+        namespace = namespace or self.namespace
+        mode = self.write_modes.get(namespace)
+        if not mode:
+            mode = write_mode_for(self.write_mode_config, namespace)
+            self.write_modes[namespace] = mode
+        return mode
 
     async def prepare_didcomm_services(
         self,
         profile: Profile,
         mediation_records: List[MediationRecord] | None = None
     ):
-        """Prepare didcomm service for adding to diddocContent."""
+        """Prepare didcomm service for adding to diddocContent.
+
+        Services are memoized per wallet, endpoints and mediation records used,
+        until any mediation record changes. The event bus runs the handler
+        clearing the memo from its task queue, so services prepared just after a
+        mediation change may still come from the memo until that handler runs.
+        """
         svc_endpoints = []
         default_endpoint = profile.settings.get("default_endpoint")
         if default_endpoint:
             svc_endpoints.append(default_endpoint)
         svc_endpoints.extend(profile.settings.get("additional_endpoints", []))
 
+        key = (
+            wallet_id_of(profile),
+            tuple(svc_endpoints),
+            tuple(record.mediation_id for record in mediation_records or []),
+        )
+        services = self._services.get(key)
+        if services is not None:
+            self._services.move_to_end(key)
+            return deepcopy(services)
+
         route_manager = profile.inject(RouteManager)
         routing_keys: List[str] = []
         if mediation_records:
-            for mediation_record in mediation_records:
-                (
-                    mediator_routing_keys,
-                    endpoint,
-                ) = await route_manager.routing_info(profile, mediation_record)
-                routing_keys = [*routing_keys, *(mediator_routing_keys or [])]
+            routing_info = await asyncio.gather(
+                *(
+                    route_manager.routing_info(profile, mediation_record)
+                    for mediation_record in mediation_records
+                )
+            )
+            for mediator_routing_keys, endpoint in routing_info:
+                routing_keys.extend(mediator_routing_keys or [])
                 if endpoint:
                     svc_endpoints = [endpoint]
+            routing_keys = list(dict.fromkeys(routing_keys))
 
         services = []
         for index, endpoint in enumerate(svc_endpoints or []):
@@ -80,7 +219,278 @@ class IndyRegistrar:
                     "priority": index,
                 }
             )
-        return services
+
+        self._services[key] = services
+        if len(self._services) > SERVICES_CACHE_SIZE:
+            self._services.popitem(last=False)
+        return deepcopy(services)
+
+    async def _prepare(
+        self,
+        profile: Profile,
+        session: ProfileSession,
+        public_did: DIDInfo,
+        *,
+        ldp_vc: bool = False,
+    ) -> PreparedRegistration:
+        """Create and store the did:indy DIDInfo for a nym, if not yet created.
+
+        A did:indy already stored whose ledger write failed is prepared to be
+        published again with the content of that write.
+        """
+        wallet = session.inject(BaseWallet)
+        namespace = self.namespace_for(profile)
+        did = f"did:indy:{namespace}:{public_did.did}"
+
+        # Exists?
+        try:
+            previous = await wallet.get_local_did(did)
+        except WalletNotFoundError:
+            previous = None
+        if previous:
+            failed = await self.outbox.failed_write(session, did)
+            if not failed:
+                return PreparedRegistration(public_did, previous, {}, created=False)
+            return PreparedRegistration(
+                public_did,
+                previous,
+                failed.doc_content,
+                write_mode=failed.write_mode,
+                write_id=failed.write_id,
+            )
+
+        # Enable ldp-vc issuance?
+        if ldp_vc:
+            kid = f"{did}#assert"
+            key = await self.keys.claim(profile, session, kid)
+            did_info = DIDInfo(
+                did=did,
+                # TODO ACA-Py's cred issuance signatures currently rely on the verkey of
+                # the DIDInfo object being the signer
+                verkey=key.verkey,
+                metadata={
+                    "namespace": namespace,
+                },
+                method=INDY,
+                key_type=ED25519,
+            )
+            await wallet.store_did(did_info)
+            vm = Ed25519VerificationKey2020.make(
+                id=kid, controller=did, public_key_multibase=key.public_key_multibase
+            )
+            doc_content = {
+                "@context": ["https://w3id.org/security/suites/ed25519-2020/v1"],
+                "verificationMethod": [vm.serialize()],
+                "assertionMethod": [vm.id],
+            }
+        else:
+            did_info = DIDInfo(
+                did=did,
+                verkey=public_did.verkey,
+                metadata={
+                    "namespace": namespace,
+                },
+                method=INDY,
+                key_type=ED25519,
+            )
+            await wallet.store_did(did_info)
+            doc_content = {}
+
+        return PreparedRegistration(public_did, did_info, doc_content)
+
+    async def _publish(self, base_ledger: BaseLedger, prepared: PreparedRegistration):
+        """Write the diddocContent of a prepared registration to the ledger.
+
+        Depending on the write mode, diddocContent is written on the NYM, as an
+        ATTRIB, or both. In auto mode, the NYM is written unless the ledger is
+        known to reject diddocContent on NYM, in which case only the ATTRIB is
+        written; the first rejection is remembered for the namespace.
+        """
+        public_did = prepared.nym
+        namespace = prepared.namespace or self.namespace
+        mode = prepared.write_mode or self.write_mode_for(namespace)
+        if mode == "auto" and self.nym_diddoc_support.get(namespace, True):
+            try:
+                await base_ledger.txn_submit(
+                    self._nym_request(prepared), sign=True, sign_did=public_did
+                )
+                self.nym_diddoc_support[namespace] = True
+                return
+            except LedgerTransactionError as error:
+                if not rejects_nym_diddoc(error):
+                    raise
+                self.nym_diddoc_support[namespace] = False
+
+        await asyncio.gather(
+            *(
+                base_ledger.txn_submit(request, sign=True, sign_did=public_did)
+                for request in self._write_requests(prepared)
+            )
+        )
+
+    def _write_requests(self, prepared: PreparedRegistration) -> List[Request]:
+        """Return the ledger requests writing diddocContent for the write mode.
+
+        In auto mode, this is the NYM unless the ledger is known to reject
+        diddocContent on NYM.
+        """
+        namespace = prepared.namespace or self.namespace
+        mode = prepared.write_mode or self.write_mode_for(namespace)
+        if mode == "auto":
+            mode = "nym" if self.nym_diddoc_support.get(namespace, True) else "attrib"
+
+        requests = []
+        if mode in ("nym", "both"):
+            requests.append(self._nym_request(prepared))
+        if mode in ("attrib", "both"):
+            requests.append(self._attrib_request(prepared))
+        return requests
+
+    def _nym_request(self, prepared: PreparedRegistration) -> Request:
+        """Return a NYM request writing diddocContent."""
+        public_did = prepared.nym
+        return ledger.build_nym_request(
+            public_did.did,
+            public_did.did,
+            diddoc_content=json.dumps(prepared.doc_content),
+        )
+
+    def _attrib_request(self, prepared: PreparedRegistration) -> Request:
+        """Return a raw ATTRIB request writing diddocContent."""
+        public_did = prepared.nym
+        return ledger.build_attrib_request(
+            public_did.did,
+            public_did.did,
+            xhash=None,
+            raw=json.dumps({"diddocContent": prepared.doc_content}),
+            enc=None,
+        )
+
+    async def _publish_endorsed(
+        self,
+        profile: Profile,
+        base_ledger: BaseLedger,
+        connection_id: str,
+        pending: Mapping[str, PreparedRegistration],
+    ) -> Dict[str, Optional[Exception]]:
+        """Sign registrations as author and have them endorsed and written in bulk."""
+        endorser_did = await endorser_did_for(profile, connection_id)
+        semaphore = asyncio.Semaphore(self.write_concurrency)
+
+        async def _sign(request: Request, public_did: DIDInfo) -> str:
+            request.set_endorser(endorser_did)
+            async with semaphore:
+                return await base_ledger.txn_submit(
+                    request, sign=True, sign_did=public_did, write_ledger=False
+                )
+
+        owners = []
+        signing = []
+        for key, prepared in pending.items():
+            for request in self._write_requests(prepared):
+                owners.append(key)
+                signing.append(_sign(request, prepared.nym))
+        signed = await asyncio.gather(*signing, return_exceptions=True)
+
+        errors: Dict[str, Optional[Exception]] = dict.fromkeys(pending)
+        transactions = []
+        for key, transaction in zip(owners, signed):
+            if isinstance(transaction, Exception):
+                errors[key] = errors[key] or transaction
+            else:
+                transactions.append((key, transaction))
+
+        outcomes = await self.endorsements.endorse_all(
+            profile, connection_id, [transaction for _, transaction in transactions]
+        )
+        for (key, _), error in zip(transactions, outcomes):
+            errors[key] = errors[key] or error
+        return errors
+
+    async def _publish_many(
+        self, profile: Profile, pending: Mapping[str, PreparedRegistration]
+    ) -> Dict[str, Optional[Exception]]:
+        """Write many prepared registrations; return None or the error for each.
+
+        If the agent is an author, the writes are sent to its endorser instead.
+        At most write_concurrency registrations are written at a time.
+        """
+        connection_id = await endorser_connection_for(profile)
+        base_ledger = profile.inject(BaseLedger)
+        async with base_ledger:
+            if connection_id:
+                return await self._publish_endorsed(
+                    profile, base_ledger, connection_id, pending
+                )
+
+            semaphore = asyncio.Semaphore(self.write_concurrency)
+
+            async def _publish_one(prepared: PreparedRegistration):
+                async with semaphore:
+                    try:
+                        await self._publish(base_ledger, prepared)
+                    except Exception as error:
+                        return error
+
+            errors = await asyncio.gather(*(_publish_one(p) for p in pending.values()))
+        return dict(zip(pending, errors))
+
+    async def _publish_or_enqueue(
+        self, profile: Profile, pending: Mapping[str, PreparedRegistration]
+    ) -> Dict[str, Optional[Exception]]:
+        """Write many prepared registrations, queueing failed writes for retry.
+
+        Returns None or the error for each. Every failed write is stored; only
+        those failing with a transient error are queued for retry and not
+        returned. Other errors, and all errors with the outbox disabled, are
+        returned and their writes are stored as failed, to be published again
+        when the DID is next registered. An error failing the whole batch, such
+        as a missing endorser connection, fails the write of each registration.
+        """
+        try:
+            errors = await self._publish_many(profile, pending)
+        except Exception as error:
+            errors = dict.fromkeys(pending, error)
+
+        queued = False
+        for key, error in errors.items():
+            prepared = pending[key]
+            if not error:
+                if prepared.write_id:
+                    await self.outbox.complete(profile, prepared.write_id)
+                continue
+            record = await self.outbox.enqueue(
+                profile,
+                prepared.did_info.did,
+                prepared.nym.did,
+                prepared.doc_content,
+                error,
+                prepared.write_mode,
+            )
+            if record.state == LedgerWriteRecord.STATE_PENDING:
+                errors[key] = None
+                queued = True
+        if queued:
+            await self.tenants.mark(profile)
+        return errors
+
+    async def _retry(self, profile: Profile, record: LedgerWriteRecord):
+        """Write a queued diddocContent write again."""
+        async with profile.session() as session:
+            wallet = session.inject(BaseWallet)
+            public_did = await wallet.get_local_did(record.nym)
+            did_info = await wallet.get_local_did(record.did)
+
+        prepared = PreparedRegistration(
+            public_did, did_info, record.doc_content, write_mode=record.write_mode
+        )
+        error = (await self._publish_many(profile, {record.did: prepared}))[record.did]
+        if error:
+            raise error
+
+        resolver = profile.inject_or(IndyResolver)
+        if resolver:
+            await resolver.invalidate(record.did)
 
     async def from_public_nym(
         self,
@@ -93,7 +503,8 @@ class IndyRegistrar:
     ) -> DIDInfo:
         """Create a did:indy from an already published nym.
 
-        If nym is not provided, current public "did" is used.
+        If nym is not provided, current public "did" is used. A ledger write
+        failing with a transient error is queued for retry rather than raised.
         """
         if mediation_records and not didcomm:
             raise ValueError("Mediation records passed but didcomm flag not set")
@@ -107,73 +518,201 @@ class IndyRegistrar:
 
             if not public_did:
                 raise IndyRegistrarError("No nym provided and public DID not set")
-            did = f"did:indy:{self.namespace}:{public_did.did}"
 
-            # Exists?
-            try:
-                previous = await wallet.get_local_did(did)
-                return previous
-            except WalletNotFoundError:
-                pass
-
-            # Enable ldp-vc issuance?
-            if ldp_vc:
-                kid = f"{did}#assert"
-                key = await wallet.create_key(key_type=ED25519, kid=kid)
-                public_key_multibase = multibase.encode(
-                    multicodec.wrap("ed25519-pub", base58.b58decode(key.verkey)),
-                    "base58btc",
-                )
-                did_info = DIDInfo(
-                    did=did,
-                    # TODO ACA-Py's cred issuance signatures currently rely on the verkey of
-                    # the DIDInfo object being the signer
-                    verkey=key.verkey,
-                    metadata={
-                        "namespace": self.namespace,
-                    },
-                    method=INDY,
-                    key_type=ED25519,
-                )
-                await wallet.store_did(did_info)
-                vm = Ed25519VerificationKey2020.make(
-                    id=kid, controller=did, public_key_multibase=public_key_multibase
+            prepared = await self._prepare(profile, session, public_did, ldp_vc=ldp_vc)
+
+        if not prepared.created:
+            return prepared.did_info
+
+        if didcomm:
+            services = await self.prepare_didcomm_services(profile, mediation_records)
+            prepared.doc_content["service"] = services
+
+        pending = {public_did.did: prepared}
+        error = (await self._publish_or_enqueue(profile, pending))[public_did.did]
+        if error:
+            raise error
+
+        return prepared.did_info
+
+    async def from_public_nyms(
+        self,
+        profile: Profile,
+        nyms: Sequence[str],
+        *,
+        didcomm: bool = True,
+        ldp_vc: bool = False,
+        mediation_records: List[MediationRecord] | None = None
+    ) -> Dict[str, DIDInfo | Exception]:
+        """Create a did:indy from each of many already published nyms.
+
+        Wallet work runs in sessions of up to batch_size nyms and at most
+        write_concurrency registrations are written to the ledger at a time.
+        Authors send every registration to their endorser in one batch.
+        Returns a mapping of nym to the created DIDInfo or the error raised
+        creating it.
+        """
+        if mediation_records and not didcomm:
+            raise ValueError("Mediation records passed but didcomm flag not set")
+
+        nyms = list(dict.fromkeys(nyms))
+        results: Dict[str, DIDInfo | Exception] = {}
+        pending: Dict[str, PreparedRegistration] = {}
+        for offset in range(0, len(nyms), self.batch_size):
+            async with profile.session() as session:
+                wallet = session.inject(BaseWallet)
+                for nym in nyms[offset : offset + self.batch_size]:
+                    try:
+                        public_did = await wallet.get_local_did(nym)
+                        prepared = await self._prepare(
+                            profile, session, public_did, ldp_vc=ldp_vc
+                        )
+                    except BaseError as error:
+                        results[nym] = error
+                        continue
+
+                    if prepared.created:
+                        pending[nym] = prepared
+                    else:
+                        results[nym] = prepared.did_info
+
+        if pending and didcomm:
+            services = await self.prepare_didcomm_services(profile, mediation_records)
+            for prepared in pending.values():
+                prepared.doc_content["service"] = services
+
+        if pending:
+            errors = await self._publish_or_enqueue(profile, pending)
+            for nym, prepared in pending.items():
+                results[nym] = errors[nym] or prepared.did_info
+
+        return {nym: results[nym] for nym in nyms}
+
+    async def _read(self, base_ledger: BaseLedger, request) -> dict:
+        """Submit a read request and return the result of the reply."""
+        response = await base_ledger.txn_submit(request, sign=False)
+        return json.loads(response)["result"]
+
+    async def read_doc_content(
+        self, base_ledger: BaseLedger, nym: str, namespace: Optional[str] = None
+    ) -> dict:
+        """Return the diddocContent currently published for nym on namespace.
+
+        diddocContent is read from the NYM and, unless the write mode is "nym",
+        from the ATTRIB when the NYM has none.
+        """
+        content, _ = await self._read_published(base_ledger, nym, namespace)
+        return content
+
+    async def _read_published(
+        self, base_ledger: BaseLedger, nym: str, namespace: Optional[str] = None
+    ) -> Tuple[dict, Optional[WriteMode]]:
+        """Return the diddocContent published for nym and where it was read from.
+
+        The source is "nym" or "attrib", or None if no diddocContent is published.
+        """
+        namespace = namespace or self.namespace
+        mode = self.write_mode_for(namespace)
+        legacy = mode == "auto" and not self.nym_diddoc_support.get(namespace, True)
+        if mode != "attrib" and not legacy:
+            content = await self._read_nym_content(base_ledger, nym)
+            if content:
+                return content, "nym"
+            if mode == "nym":
+                return {}, None
+
+        content = await self._read_attrib_content(base_ledger, nym)
+        return (content, "attrib") if content else ({}, None)
+
+    async def _read_nym_content(self, base_ledger: BaseLedger, nym: str) -> dict:
+        """Return the diddocContent published on the NYM of nym."""
+        result = await self._read(base_ledger, ledger.build_get_nym_request(None, nym))
+        data = json.loads(result.get("data") or "{}")
+        content = data.get("diddocContent")
+        if isinstance(content, str):
+            content = json.loads(content)
+        return content or {}
+
+    async def _read_attrib_content(self, base_ledger: BaseLedger, nym: str) -> dict:
+        """Return the diddocContent published as an ATTRIB of nym."""
+        result = await self._read(
+            base_ledger,
+            ledger.build_get_attrib_request(None, nym, "diddocContent", None, None),
+        )
+        data = json.loads(result.get("data") or "{}")
+        return data.get("diddocContent") or {}
+
+    async def update_document(
+        self,
+        profile: Profile,
+        did: str,
+        *,
+        services: Optional[List[dict]] = None,
+        verification_methods: Optional[List[dict]] = None,
+    ) -> List[str]:
+        """Update the services or verification methods of a did:indy.
+
+        The desired values are compared against the diddocContent currently on
+        the ledger and a write is only submitted when they differ. In "both"
+        mode, the NYM and ATTRIB copies are each compared and both are written,
+        so they never diverge. Otherwise, the write replaces only the NYM or
+        ATTRIB the current diddocContent was read from; the write mode is used if
+        none is published. Returns the diddocContent keys that changed; an empty
+        list means nothing was written.
+        """
+        async with profile.session() as session:
+            wallet = session.inject(BaseWallet)
+            did_info = await wallet.get_local_did(did)
+            if did_info.method.method_name != INDY.method_name:
+                raise IndyRegistrarError(f"{did} is not a did:indy")
+            public_did = await wallet.get_local_did(did.rsplit(":", 1)[-1])
+
+        namespace = namespace_of(did)
+        base_ledger = profile.inject(BaseLedger)
+        async with base_ledger:
+            if self.write_mode_for(namespace) == "both":
+                copies = await asyncio.gather(
+                    self._read_nym_content(base_ledger, public_did.did),
+                    self._read_attrib_content(base_ledger, public_did.did),
                 )
-                doc_content = {
-                    "@context": ["https://w3id.org/security/suites/ed25519-2020/v1"],
-                    "verificationMethod": [vm.serialize()],
-                    "assertionMethod": [vm.id],
-                }
+                current = copies[0] or copies[1]
+                published = "both"
             else:
-                did_info = DIDInfo(
-                    did=did,
-                    verkey=public_did.verkey,
-                    metadata={
-                        "namespace": self.namespace,
-                    },
-                    method=INDY,
-                    key_type=ED25519,
+                current, published = await self._read_published(
+                    base_ledger, public_did.did, namespace
                 )
-                await wallet.store_did(did_info)
-                doc_content = {}
+                copies = [current]
+
+            desired = dict(current)
+            if services is not None:
+                desired["service"] = services
+            if verification_methods is not None:
+                desired["verificationMethod"] = verification_methods
 
-            if didcomm:
-                services = await self.prepare_didcomm_services(profile, mediation_records)
-                doc_content["service"] = services
+            changed = {
+                key
+                for copy in copies
+                for key in desired.keys() | copy.keys()
+                if desired.get(key) != copy.get(key)
+            }
+            if not changed:
+                return []
 
-            nym_txn = ledger.build_nym_request(
-                public_did.did, public_did.did, diddoc_content=json.dumps(doc_content)
+        error = (
+            await self._publish_or_enqueue(
+                profile,
+                {
+                    did: PreparedRegistration(
+                        public_did, did_info, desired, write_mode=published
+                    )
+                },
             )
-            base_ledger = session.inject(BaseLedger)
-            async with base_ledger:
-                await base_ledger.txn_submit(nym_txn, sign=True, sign_did=public_did)
-                attrib_txn = ledger.build_attrib_request(
-                    public_did.did,
-                    public_did.did,
-                    xhash=None,
-                    raw=json.dumps({"diddocContent": doc_content}),
-                    enc=None,
-                )
-                await base_ledger.txn_submit(attrib_txn, sign=True, sign_did=public_did)
+        )[did]
+        if error:
+            raise error
+
+        resolver = profile.inject_or(IndyResolver)
+        if resolver:
+            await resolver.invalidate(did)
 
-            return did_info
+        return sorted(changed)
@@ -1,20 +1,63 @@
 """did:indy resolver."""
 
+import asyncio
+from collections import defaultdict
+from copy import deepcopy
+from functools import lru_cache
+import logging
 import re
-from typing import Dict, Optional, Pattern, Sequence, Text
+import time
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Text,
+    Tuple,
+)
 from acapy_agent.config.injection_context import InjectionContext
-from acapy_agent.config.ledger import fetch_genesis_transactions
 from acapy_agent.core.profile import Profile
 from acapy_agent.messaging.valid import B58
 from acapy_agent.resolver.base import BaseDIDResolver, DIDNotFound, ResolverError, ResolverType
-from indy_vdr import Resolver, VdrError, VdrErrorCode, open_pool
+from indy_vdr import Resolver, VdrError, VdrErrorCode
+
+from .cache import ResolutionCache, StorageResolutionCache
+from .config import get_int
+from .genesis import GenesisCache
+from .health import PoolHealthMonitor
+from .metrics import MetricsRegistry
+from .pools import LedgerPools
+from .singleflight import SingleFlight
 
 
+LOGGER = logging.getLogger(__name__)
+
 INDY_DID_PATTERN = re.compile(
     rf"^did:indy:(?P<namespace>[^:]+(:[^:]+)?):[{B58}]{{21,22}}$"
 )
 
 
+@lru_cache(maxsize=4096)
+def namespace_of(did: str) -> Optional[str]:
+    """Return the namespace of a did:indy DID or None if did is not a did:indy."""
+    if not did.startswith("did:indy:"):
+        return None
+    match = INDY_DID_PATTERN.fullmatch(did)
+    return match.group("namespace") if match else None
+
+
+
+def ledger_position(resolve_result: dict) -> Tuple[Optional[int], Optional[int]]:
+    """Return the seqNo and txnTime of the transaction a DID resolved from."""
+    metadata = resolve_result.get("didDocumentMetadata") or {}
+    reply = (metadata.get("nodeResponse") or {}).get("result") or {}
+    seq_no = metadata.get("seqNo", reply.get("seqNo"))
+    txn_time = metadata.get("txnTime", reply.get("txnTime"))
+    return seq_no, txn_time
+
 
 class IndyResolver(BaseDIDResolver):
     """Indy DID Resolver."""
@@ -28,19 +71,68 @@ class IndyResolver(BaseDIDResolver):
         """Initialize Indy Resolver."""
         super().__init__(ResolverType.NATIVE)
         self._resolver: Resolver | None = None
+        self.pools: LedgerPools | None = None
+        self.health: PoolHealthMonitor | None = None
+        self.lazy = False
+        self.namespaces: FrozenSet[str] | None = None
+        self.cache = ResolutionCache()
+        self.storage_cache: StorageResolutionCache | None = None
+        self.in_flight: SingleFlight[dict] = SingleFlight()
+        self.batch_concurrency = 10
+        self._revalidations: Set[asyncio.Task] = set()
+
+        self.metrics = MetricsRegistry()
+        self._latency = self.metrics.histogram(
+            "acapy_did_indy_resolve_duration_seconds",
+            "Latency of did:indy resolutions sent to the ledger",
+            ["namespace"],
+        )
+        self._outcomes = self.metrics.counter(
+            "acapy_did_indy_resolve_total",
+            "did:indy resolutions sent to the ledger by outcome",
+            ["namespace", "outcome"],
+        )
+        self._ledger_in_flight = self.metrics.gauge(
+            "acapy_did_indy_resolve_in_flight",
+            "did:indy resolutions awaiting the ledger",
+            ["namespace"],
+        )
+        self._cache_requests = self.metrics.counter(
+            "acapy_did_indy_cache_requests_total",
+            "Resolution cache lookups by result",
+            ["result"],
+        )
+        self._cache_entries = self.metrics.gauge(
+            "acapy_did_indy_cache_entries", "Entries in the resolution cache"
+        )
+        self._coalesced = self.metrics.counter(
+            "acapy_did_indy_resolve_coalesced_total",
+            "Resolutions that awaited a ledger read already in flight",
+        )
+        self.metrics.on_collect(self._collect_metrics)
 
     async def setup(self, context: InjectionContext):
         """Perform required setup for Indy DID resolution."""
         settings = context.settings.for_plugin("acapy_did_indy")
+        self.cache = ResolutionCache.from_settings(settings)
+        self.storage_cache = StorageResolutionCache.from_settings(settings)
+        self.batch_concurrency = get_int(settings, "batch_concurrency", 10)
         auto = settings.get_bool("auto_ledger")
         ledgers: Dict[str, str] | None = settings.get("ledgers")
         if auto:
             resolver = Resolver(autopilot=True)
         elif ledgers:
-            resolver = Resolver(pool_map={
-                name: await open_pool(transactions=await fetch_genesis_transactions(genesis_url))
-                for name, genesis_url in ledgers.items()
-            })
+            self.pools = LedgerPools(ledgers, GenesisCache.from_settings(settings))
+            self.pools.on_reopen = self._replace_pool
+            self.namespaces = frozenset(ledgers)
+            self.health = PoolHealthMonitor.from_settings(
+                settings, self.pools, self.metrics
+            )
+            self.lazy = settings.get_bool("lazy_pools")
+            if self.lazy:
+                resolver = Resolver(pool_map={})
+            else:
+                resolver = Resolver(pool_map=dict(await self.pools.open_all()))
         else:
             raise ResolverError(
                 "Could not configure indy resolver; missing auto flag or ledger map"
@@ -48,6 +140,37 @@ class IndyResolver(BaseDIDResolver):
 
         self._resolver = resolver
 
+    async def _ensure_pool(self, did: str):
+        """Open the pool for the namespace of did and add it to the resolver."""
+        assert self.pools
+        namespace = namespace_of(did)
+        if not namespace or namespace not in self.pools:
+            return
+
+        try:
+            pool = await self.pools.open(namespace)
+        except Exception as error:
+            raise ResolverError(f"Could not open pool for namespace {namespace}") from error
+        self.resolver.add_ledger(namespace, pool)
+
+    def _replace_pool(self, namespace: str, pool):
+        """Resolve namespace with a pool reopened from changed genesis."""
+        if self._resolver:
+            self._resolver.add_ledger(namespace, pool)
+
+    def _collect_metrics(self):
+        """Mirror cache and coalescing counters into metrics."""
+        stats = self.cache.stats()
+        self._cache_requests.set("hit", value=stats["hits"])
+        self._cache_requests.set("stale_hit", value=stats["stale_hits"])
+        self._cache_requests.set("miss", value=stats["misses"])
+        self._cache_entries.set(value=stats["entries"])
+        self._coalesced.set(value=self.in_flight.coalesced)
+        if self.storage_cache:
+            storage_stats = self.storage_cache.stats()
+            self._cache_requests.set("storage_hit", value=storage_stats["hits"])
+            self._cache_requests.set("storage_miss", value=storage_stats["misses"])
+
     @property
     def resolver(self):
         """Return resolver."""
@@ -59,6 +182,19 @@ class IndyResolver(BaseDIDResolver):
         """Return supported_did_regex of Indy DID Resolver."""
         return INDY_DID_PATTERN
 
+    def supports_namespace(self, namespace: str) -> bool:
+        """Return whether DIDs in namespace can be resolved."""
+        return self.namespaces is None or namespace in self.namespaces
+
+    async def supports(self, profile: Profile, did: str) -> bool:
+        """Return whether this resolver supports did.
+
+        DIDs that are not did:indy or are in a namespace without a configured
+        ledger are rejected without running the pattern match again.
+        """
+        namespace = namespace_of(did)
+        return namespace is not None and self.supports_namespace(namespace)
+
     async def _resolve(
         self,
         profile: Profile,
@@ -66,12 +202,111 @@ class IndyResolver(BaseDIDResolver):
         service_accept: Optional[Sequence[Text]] = None,
     ) -> dict:
         """Resolve an indy DID."""
+        namespace = namespace_of(did)
+        if namespace is not None and not self.supports_namespace(namespace):
+            raise DIDNotFound(f"No ledger configured for namespace {namespace}")
+
+        entry = self.cache.get(did)
+        if entry:
+            if not entry.found:
+                raise DIDNotFound(f"DID {did} not found")
+            if self.cache.is_stale(entry):
+                self._revalidate(did)
+            return deepcopy(entry.document)
+
+        doc = await self.in_flight.do(did, lambda: self._fetch(did))
+        return deepcopy(doc)
+
+    def _revalidate(self, did: str):
+        """Refresh a stale cache entry in the background."""
+        if did in self.in_flight:
+            return
+
+        async def _refresh():
+            try:
+                await self.in_flight.do(did, lambda: self._fetch(did, revalidate=True))
+            except Exception:
+                LOGGER.warning("Background refresh of %s failed", did, exc_info=True)
+
+        task = asyncio.ensure_future(_refresh())
+        self._revalidations.add(task)
+        task.add_done_callback(self._revalidations.discard)
+
+    async def _fetch(self, did: str, revalidate: bool = False) -> dict:
+        """Resolve an indy DID from storage or the ledger and cache the result.
+
+        Revalidation skips storage and always reads the ledger.
+        """
+        if self.storage_cache and not revalidate:
+            doc = await self.storage_cache.get(did)
+            if doc:
+                self.cache.put(did, doc)
+                return doc
+
+        if self.lazy:
+            await self._ensure_pool(did)
+
+        namespace = namespace_of(did) or "unknown"
+        outcome = "error"
+        self._ledger_in_flight.inc(namespace)
+        start = time.perf_counter()
         try:
             resolve_result = await self.resolver.resolve(did)
+            outcome = "found"
         except VdrError as error:
             if error.code == VdrErrorCode.RESOLVER and "Object not found" in str(error):
+                outcome = "not_found"
+                self.cache.put_not_found(did)
                 raise DIDNotFound(f"DID {did} not found") from error
+            outcome = f"vdr_{error.code.name.lower()}"
             raise ResolverError("Unexpected error in Indy resolver") from error
+        finally:
+            self._latency.observe(namespace, value=time.perf_counter() - start)
+            self._outcomes.inc(namespace, outcome)
+            self._ledger_in_flight.dec(namespace)
 
         doc = resolve_result["didDocument"]
+        self.cache.put(did, doc)
+        if self.storage_cache:
+            await self.storage_cache.put(did, doc, *ledger_position(resolve_result))
         return doc
+
+    async def invalidate(self, did: str):
+        """Drop cached resolutions of did, such as after it is updated."""
+        self.cache.invalidate(did)
+        if self.storage_cache:
+            await self.storage_cache.invalidate(did)
+
+    async def resolve_many(
+        self, profile: Profile, dids: Sequence[str]
+    ) -> Dict[str, dict | Exception]:
+        """Resolve many indy DIDs.
+
+        DIDs are grouped by namespace and resolved with at most batch_concurrency
+        lookups in flight per namespace. Returns a mapping of DID to the resolved
+        document or the error raised resolving it; an error resolving one DID
+        never fails the others.
+        """
+        results: Dict[str, dict | Exception] = {}
+        by_namespace: Dict[str, List[str]] = defaultdict(list)
+        for did in dict.fromkeys(dids):
+            namespace = namespace_of(did)
+            if namespace:
+                by_namespace[namespace].append(did)
+            else:
+                results[did] = ResolverError(f"DID {did} is not a did:indy DID")
+
+        async def _resolve_one(semaphore: asyncio.Semaphore, did: str):
+            async with semaphore:
+                try:
+                    results[did] = await self._resolve(profile, did)
+                except Exception as error:
+                    results[did] = error
+
+        lookups = []
+        for namespace_dids in by_namespace.values():
+            semaphore = asyncio.Semaphore(self.batch_concurrency)
+            lookups.extend(_resolve_one(semaphore, did) for did in namespace_dids)
+        await asyncio.gather(*lookups)
+
+        return {did: results[did] for did in dict.fromkeys(dids)}
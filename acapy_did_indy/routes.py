@@ -1,16 +1,31 @@
 """Routes for creating did:web."""
 
 from aiohttp import web
-from aiohttp_apispec import docs, request_schema, response_schema
+from aiohttp_apispec import (
+    docs,
+    match_info_schema,
+    querystring_schema,
+    request_schema,
+    response_schema,
+)
 from acapy_agent.admin.request_context import AdminRequestContext
 from acapy_agent.messaging.models.openapi import OpenAPISchema
+from acapy_agent.protocols.coordinate_mediation.v1_0.models.mediation_record import (
+    MediationRecord,
+)
 from acapy_agent.protocols.coordinate_mediation.v1_0.route_manager import (
     RouteManager,
 )
+from acapy_agent.resolver.base import DIDNotFound
 from acapy_agent.storage.base import StorageNotFoundError
-from marshmallow import fields
+from acapy_agent.wallet.error import WalletNotFoundError
+from marshmallow import fields, validate
 
-from .registrar import IndyRegistrar
+from .jobs import RegistrationJobRecord, RegistrationJobRecordSchema, RegistrationJobs
+from .metrics import CONTENT_TYPE
+from .outbox import LedgerWriteRecord, LedgerWriteRecordSchema
+from .registrar import IndyRegistrar, IndyRegistrarError
+from .resolver import IndyResolver
 
 
 class CreateDIDIndyRequestSchema(OpenAPISchema):
@@ -38,6 +53,80 @@ class CreateDIDIndyRequestSchema(OpenAPISchema):
     )
 
 
+class CreateDIDIndyQueryStringSchema(OpenAPISchema):
+    """Query string schema for creating a did:indy."""
+
+    background = fields.Bool(
+        required=False,
+        metadata={
+            "description": (
+                "Create the did:indy in a background job and return the job; "
+                "defaults to False"
+            )
+        },
+    )
+
+
+class RegistrationJobIdMatchInfoSchema(OpenAPISchema):
+    """Path parameters for a registration job."""
+
+    job_id = fields.Str(required=True, metadata={"description": "Job identifier"})
+
+
+class RegistrationJobListQueryStringSchema(OpenAPISchema):
+    """Query string schema for listing registration jobs."""
+
+    state = fields.Str(
+        required=False,
+        validate=validate.OneOf(
+            [
+                RegistrationJobRecord.STATE_PENDING,
+                RegistrationJobRecord.STATE_COMPLETED,
+                RegistrationJobRecord.STATE_FAILED,
+            ]
+        ),
+        metadata={"description": "Only list jobs in this state"},
+    )
+
+
+class RegistrationJobListSchema(OpenAPISchema):
+    """Response schema for listing registration jobs."""
+
+    results = fields.List(
+        fields.Nested(RegistrationJobRecordSchema()),
+        required=True,
+        metadata={"description": "Registration jobs"},
+    )
+
+
+class LedgerWriteListQueryStringSchema(OpenAPISchema):
+    """Query string schema for listing queued ledger writes."""
+
+    state = fields.Str(
+        required=False,
+        validate=validate.OneOf(
+            [
+                LedgerWriteRecord.STATE_PENDING,
+                LedgerWriteRecord.STATE_COMPLETED,
+                LedgerWriteRecord.STATE_FAILED,
+            ]
+        ),
+        metadata={
+            "description": "Only list writes in this state; defaults to pending and failed"
+        },
+    )
+
+
+class LedgerWriteListSchema(OpenAPISchema):
+    """Response schema for listing queued ledger writes."""
+
+    results = fields.List(
+        fields.Nested(LedgerWriteRecordSchema()),
+        required=True,
+        metadata={"description": "Queued ledger writes"},
+    )
+
+
 class CreateDIDResponseSchema(OpenAPISchema):
     """Response schema for creating a did:web."""
 
@@ -47,12 +136,184 @@ class CreateDIDResponseSchema(OpenAPISchema):
             "description": "The created did:web",
         },
     )
+    write_id = fields.Str(
+        required=False,
+        metadata={
+            "description": (
+                "Set if the ledger write is queued for retry; see "
+                "/did/indy/ledger-writes"
+            )
+        },
+    )
+
+
+class CreateDIDIndyBulkRequestSchema(OpenAPISchema):
+    """Request schema for creating many did:indy DIDs."""
+
+    nyms = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={"description": "The nyms to create did:indy DIDs from"},
+    )
+    ldp_vc = fields.Bool(
+        required=False,
+        metadata={
+            "description": "Support LDP-VC issuance with these DIDs; defaults to False"
+        },
+    )
+    didcomm = fields.Bool(
+        required=False,
+        metadata={"description": "Support DIDComm with these DIDs; defaults to True"},
+    )
+    mediation_id = fields.Str(
+        required=False,
+        metadata={"description": "Mediation record ID to be used in DIDComm service"},
+    )
+
+
+class CreateDIDIndyBulkResultSchema(OpenAPISchema):
+    """Result of creating one did:indy."""
+
+    nym = fields.Str(required=True, metadata={"description": "The nym"})
+    did = fields.Str(required=False, metadata={"description": "The created did:indy"})
+    write_id = fields.Str(
+        required=False,
+        metadata={
+            "description": (
+                "Set if the ledger write is queued for retry; see "
+                "/did/indy/ledger-writes"
+            )
+        },
+    )
+    error = fields.Str(
+        required=False, metadata={"description": "Why the did:indy could not be created"}
+    )
+
+
+class CreateDIDIndyBulkResponseSchema(OpenAPISchema):
+    """Response schema for creating many did:indy DIDs."""
+
+    results = fields.List(
+        fields.Nested(CreateDIDIndyBulkResultSchema()),
+        required=True,
+        metadata={"description": "One result per requested nym"},
+    )
+
+
+class UpdateDIDIndyRequestSchema(OpenAPISchema):
+    """Request schema for updating a did:indy."""
+
+    did = fields.Str(required=True, metadata={"description": "The did:indy to update"})
+    services = fields.List(
+        fields.Dict(),
+        required=False,
+        metadata={"description": "Services the document should have"},
+    )
+    verification_methods = fields.List(
+        fields.Dict(),
+        required=False,
+        metadata={"description": "Verification methods the document should have"},
+    )
+    didcomm = fields.Bool(
+        required=False,
+        metadata={
+            "description": (
+                "Set services to DIDComm services for the current endpoints when "
+                "services are not given; defaults to False"
+            )
+        },
+    )
+    mediation_id = fields.Str(
+        required=False,
+        metadata={"description": "Mediation record ID to be used in DIDComm service"},
+    )
+
+
+class UpdateDIDIndyResponseSchema(OpenAPISchema):
+    """Response schema for updating a did:indy."""
+
+    did = fields.Str(required=True, metadata={"description": "The updated did:indy"})
+    updated = fields.Bool(
+        required=True, metadata={"description": "Whether a ledger write was submitted"}
+    )
+    changed = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={"description": "diddocContent keys that changed"},
+    )
+    write_id = fields.Str(
+        required=False,
+        metadata={
+            "description": (
+                "Set if the ledger write is queued for retry; see "
+                "/did/indy/ledger-writes"
+            )
+        },
+    )
+
+
+class ResolveManyRequestSchema(OpenAPISchema):
+    """Request schema for resolving many did:indy DIDs."""
+
+    dids = fields.List(
+        fields.Str(),
+        required=True,
+        metadata={"description": "The did:indy DIDs to resolve"},
+    )
+
+
+class ResolveManyResultSchema(OpenAPISchema):
+    """Result of resolving one DID."""
+
+    did = fields.Str(required=True, metadata={"description": "The DID resolved"})
+    did_document = fields.Dict(
+        required=False, metadata={"description": "The resolved DID Document"}
+    )
+    error = fields.Str(
+        required=False, metadata={"description": "Why the DID could not be resolved"}
+    )
+    not_found = fields.Bool(
+        required=False, metadata={"description": "Set when the DID was not found"}
+    )
+
+
+class ResolveManyResponseSchema(OpenAPISchema):
+    """Response schema for resolving many did:indy DIDs."""
+
+    results = fields.List(
+        fields.Nested(ResolveManyResultSchema()),
+        required=True,
+        metadata={"description": "One result per requested DID"},
+    )
+
+
+async def _mediation_record(
+    context: AdminRequestContext, mediation_id: str | None, didcomm: bool
+) -> MediationRecord | None:
+    """Return the mediation record to use in DIDComm services."""
+    if mediation_id and not didcomm:
+        raise web.HTTPBadRequest(reason="mediation_id set but didcomm is not set")
+
+    route_manager = context.inject(RouteManager)
+    try:
+        return await route_manager.mediation_record_if_id(
+            profile=context.profile,
+            mediation_id=mediation_id,
+            or_default=didcomm,
+        )
+    except StorageNotFoundError:
+        raise web.HTTPNotFound(reason=f"No mediation record with id {mediation_id}")
 
 
 @docs(
     tags=["did"],
     summary="Create DID Indy.",
+    description=(
+        "With background set, a registration job is returned immediately instead; "
+        "poll it at /did/indy/jobs/{job_id} or await the did_indy_registration webhook."
+    ),
 )
+@querystring_schema(CreateDIDIndyQueryStringSchema())
 @request_schema(CreateDIDIndyRequestSchema())
 @response_schema(CreateDIDResponseSchema())
 async def create_did_indy(request: web.Request):
@@ -66,19 +327,20 @@ async def create_did_indy(request: web.Request):
     ldp_vc = body.get("ldp_vc", False)
     didcomm = body.get("didcomm", True)
     mediation_id = body.get("mediation_id")
+    background = request.query.get("background", "false").lower() == "true"
 
-    if mediation_id and not didcomm:
-        raise web.HTTPBadRequest(reason="mediation_id set but didcomm is not set")
+    mediation_record = await _mediation_record(context, mediation_id, didcomm)
 
-    route_manager = context.inject(RouteManager)
-    try:
-        mediation_record = await route_manager.mediation_record_if_id(
-            profile=context.profile,
-            mediation_id=mediation_id,
-            or_default=didcomm,
+    if background:
+        jobs = context.inject(RegistrationJobs)
+        job = await jobs.submit(
+            context.profile,
+            nym,
+            didcomm=didcomm,
+            ldp_vc=ldp_vc,
+            mediation_id=mediation_record.mediation_id if mediation_record else None,
         )
-    except StorageNotFoundError:
-        raise web.HTTPNotFound(reason=f"No mediation record with id {mediation_id}")
+        return web.json_response(job.serialize())
 
     try:
         did_info = await registrar.from_public_nym(
@@ -91,7 +353,280 @@ async def create_did_indy(request: web.Request):
     except Exception:
         raise web.HTTPInternalServerError(reason="Could not create did:indy from public nym")
 
-    return web.json_response({"did": did_info.did})
+    result = {"did": did_info.did}
+    pending = await registrar.outbox.pending_writes(context.profile, [did_info.did])
+    if did_info.did in pending:
+        result["write_id"] = pending[did_info.did].write_id
+    return web.json_response(result)
+
+
+@docs(
+    tags=["did"],
+    summary="Fetch a did:indy registration job.",
+)
+@match_info_schema(RegistrationJobIdMatchInfoSchema())
+@response_schema(RegistrationJobRecordSchema())
+async def get_registration_job(request: web.Request):
+    """Route for fetching a did:indy registration job."""
+
+    context: AdminRequestContext = request["context"]
+    job_id = request.match_info["job_id"]
+    try:
+        async with context.session() as session:
+            job = await RegistrationJobRecord.retrieve_by_id(session, job_id)
+    except StorageNotFoundError:
+        raise web.HTTPNotFound(reason=f"No registration job with id {job_id}")
+
+    return web.json_response(job.serialize())
+
+
+@docs(
+    tags=["did"],
+    summary="List did:indy registration jobs.",
+)
+@querystring_schema(RegistrationJobListQueryStringSchema())
+@response_schema(RegistrationJobListSchema())
+async def list_registration_jobs(request: web.Request):
+    """Route for listing did:indy registration jobs."""
+
+    context: AdminRequestContext = request["context"]
+    tag_filter = {"state": request.query["state"]} if "state" in request.query else None
+    async with context.session() as session:
+        jobs = await RegistrationJobRecord.query(session, tag_filter)
+
+    return web.json_response({"results": [job.serialize() for job in jobs]})
+
+
+@docs(
+    tags=["did"],
+    summary="List did:indy ledger writes queued for retry.",
+)
+@querystring_schema(LedgerWriteListQueryStringSchema())
+@response_schema(LedgerWriteListSchema())
+async def list_ledger_writes(request: web.Request):
+    """Route for listing did:indy ledger writes queued for retry."""
+
+    context: AdminRequestContext = request["context"]
+    states = (
+        [request.query["state"]]
+        if "state" in request.query
+        else [LedgerWriteRecord.STATE_PENDING, LedgerWriteRecord.STATE_FAILED]
+    )
+    async with context.session() as session:
+        writes = await LedgerWriteRecord.query(session, {"state": {"$in": states}})
+
+    return web.json_response({"results": [write.serialize() for write in writes]})
+
+
+@docs(
+    tags=["did"],
+    summary="Create many DID Indy.",
+)
+@request_schema(CreateDIDIndyBulkRequestSchema())
+@response_schema(CreateDIDIndyBulkResponseSchema())
+async def create_did_indy_bulk(request: web.Request):
+    """Route for creating many did:indy DIDs."""
+
+    context: AdminRequestContext = request["context"]
+    registrar = context.inject(IndyRegistrar)
+
+    body = await request.json()
+    nyms = body.get("nyms")
+    ldp_vc = body.get("ldp_vc", False)
+    didcomm = body.get("didcomm", True)
+    mediation_id = body.get("mediation_id")
+
+    if not isinstance(nyms, list) or not all(isinstance(nym, str) for nym in nyms):
+        raise web.HTTPBadRequest(reason="nyms must be a list of nyms")
+
+    mediation_record = await _mediation_record(context, mediation_id, didcomm)
+
+    try:
+        created = await registrar.from_public_nyms(
+            context.profile,
+            nyms,
+            didcomm=didcomm,
+            ldp_vc=ldp_vc,
+            mediation_records=[mediation_record] if mediation_record else None,
+        )
+    except IndyRegistrarError as error:
+        raise web.HTTPBadRequest(reason=error.roll_up)
+    except Exception:
+        raise web.HTTPInternalServerError(
+            reason="Could not create did:indy from public nyms"
+        )
+
+    try:
+        pending = await registrar.outbox.pending_writes(
+            context.profile,
+            [
+                result.did
+                for result in created.values()
+                if not isinstance(result, Exception)
+            ],
+        )
+    except Exception:
+        raise web.HTTPInternalServerError(reason="Could not look up queued ledger writes")
+    results = []
+    for nym, result in created.items():
+        if isinstance(result, Exception):
+            results.append({"nym": nym, "error": str(result)})
+        elif result.did in pending:
+            results.append(
+                {"nym": nym, "did": result.did, "write_id": pending[result.did].write_id}
+            )
+        else:
+            results.append({"nym": nym, "did": result.did})
+
+    return web.json_response({"results": results})
+
+
+@docs(
+    tags=["did"],
+    summary="Update DID Indy services or verification methods.",
+)
+@request_schema(UpdateDIDIndyRequestSchema())
+@response_schema(UpdateDIDIndyResponseSchema())
+async def update_did_indy(request: web.Request):
+    """Route for updating a did:indy."""
+
+    context: AdminRequestContext = request["context"]
+    registrar = context.inject(IndyRegistrar)
+
+    body = await request.json()
+    did = body.get("did")
+    services = body.get("services")
+    verification_methods = body.get("verification_methods")
+    didcomm = body.get("didcomm", False)
+    mediation_id = body.get("mediation_id")
+    if not did:
+        raise web.HTTPBadRequest(reason="did is required")
+
+    if services is None and didcomm:
+        mediation_record = await _mediation_record(context, mediation_id, didcomm)
+        services = await registrar.prepare_didcomm_services(
+            context.profile, [mediation_record] if mediation_record else None
+        )
+
+    try:
+        changed = await registrar.update_document(
+            context.profile,
+            did,
+            services=services,
+            verification_methods=verification_methods,
+        )
+    except WalletNotFoundError:
+        raise web.HTTPNotFound(reason=f"No DID {did} in wallet")
+    except IndyRegistrarError as error:
+        raise web.HTTPBadRequest(reason=error.roll_up)
+    except Exception:
+        raise web.HTTPInternalServerError(reason="Could not update did:indy")
+
+    result = {"did": did, "updated": bool(changed), "changed": changed}
+    pending = await registrar.outbox.pending_writes(context.profile, [did])
+    if did in pending:
+        result["write_id"] = pending[did].write_id
+    return web.json_response(result)
+
+
+@docs(
+    tags=["did"],
+    summary="Resolve many did:indy DIDs.",
+)
+@request_schema(ResolveManyRequestSchema())
+@response_schema(ResolveManyResponseSchema())
+async def resolve_many(request: web.Request):
+    """Route for resolving many did:indy DIDs."""
+
+    context: AdminRequestContext = request["context"]
+    resolver = context.inject(IndyResolver)
+
+    body = await request.json()
+    dids = body.get("dids")
+    if not isinstance(dids, list) or not all(isinstance(did, str) for did in dids):
+        raise web.HTTPBadRequest(reason="dids must be a list of DIDs")
+
+    resolved = await resolver.resolve_many(context.profile, dids)
+
+    results = []
+    for did, result in resolved.items():
+        if isinstance(result, DIDNotFound):
+            results.append({"did": did, "error": str(result), "not_found": True})
+        elif isinstance(result, Exception):
+            results.append({"did": did, "error": str(result)})
+        else:
+            results.append({"did": did, "did_document": result})
+
+    return web.json_response({"results": results})
+
+
+@docs(
+    tags=["did"],
+    summary="did:indy resolver metrics in Prometheus text format.",
+)
+async def resolver_metrics(request: web.Request):
+    """Route for did:indy resolver metrics."""
+
+    context: AdminRequestContext = request["context"]
+    resolver = context.inject(IndyResolver)
+    return web.Response(
+        body=resolver.metrics.render().encode(),
+        headers={"Content-Type": CONTENT_TYPE},
+    )
+
+
+class PoolHealthSchema(OpenAPISchema):
+    """Health of one ledger pool."""
+
+    namespace = fields.Str(required=True, metadata={"description": "Pool namespace"})
+    status = fields.Str(
+        required=True, metadata={"description": "healthy or degraded"}
+    )
+    consecutive_failures = fields.Int(
+        required=True, metadata={"description": "Failed checks since the last success"}
+    )
+    last_checked = fields.Float(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Unix time of the last check"},
+    )
+    last_rtt = fields.Float(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Seconds taken by the last successful check read"},
+    )
+    last_error = fields.Str(
+        required=False,
+        allow_none=True,
+        metadata={"description": "Error from the last failed check"},
+    )
+
+
+class PoolHealthResponseSchema(OpenAPISchema):
+    """Response schema for pool health."""
+
+    pools = fields.Dict(
+        keys=fields.Str(),
+        values=fields.Nested(PoolHealthSchema()),
+        required=True,
+        metadata={"description": "Pool health by namespace"},
+    )
+
+
+@docs(
+    tags=["did"],
+    summary="Health of did:indy resolver ledger pools.",
+)
+@response_schema(PoolHealthResponseSchema())
+async def pool_health(request: web.Request):
+    """Route for did:indy resolver pool health."""
+
+    context: AdminRequestContext = request["context"]
+    resolver = context.inject(IndyResolver)
+    if not resolver.health:
+        raise web.HTTPNotFound(reason="Pool health is not monitored with auto_ledger")
+
+    return web.json_response({"pools": resolver.health.report()})
 
 
 async def register(app: web.Application):
@@ -99,6 +634,14 @@ async def register(app: web.Application):
     app.add_routes(
         [
             web.post("/did/indy/from-nym", create_did_indy),
+            web.post("/did/indy/from-nyms", create_did_indy_bulk),
+            web.post("/did/indy/update", update_did_indy),
+            web.get("/did/indy/jobs", list_registration_jobs, allow_head=False),
+            web.get("/did/indy/jobs/{job_id}", get_registration_job, allow_head=False),
+            web.get("/did/indy/ledger-writes", list_ledger_writes, allow_head=False),
+            web.post("/did/indy/resolve", resolve_many),
+            web.get("/did/indy/metrics", resolver_metrics, allow_head=False),
+            web.get("/did/indy/health", pool_health, allow_head=False),
         ]
     )
 
@@ -0,0 +1,92 @@
+"""Track tenants with background did:indy work across restarts."""
+
+import logging
+from typing import List, Optional
+
+from acapy_agent.core.profile import Profile
+from acapy_agent.multitenant.base import BaseMultitenantManager
+from acapy_agent.storage.base import BaseStorage
+from acapy_agent.storage.error import StorageNotFoundError
+from acapy_agent.storage.record import StorageRecord
+from acapy_agent.wallet.models.wallet_record import WalletRecord
+
+LOGGER = logging.getLogger(__name__)
+
+TENANT_RECORD_TYPE = "did_indy_tenant_work"
+
+
+def wallet_id_of(profile: Profile) -> Optional[str]:
+    """Return the wallet id of a tenant profile or None for the base wallet."""
+    return profile.settings.get("wallet.id")
+
+
+class Tenants:
+    """Remember which tenants have background work so it resumes after a restart.
+
+    Background records live in each tenant's own wallet. The base wallet keeps
+    one marker record per tenant with work so that only those tenant profiles
+    are opened on startup.
+    """
+
+    def __init__(self):
+        """Initialize the tracker."""
+        self.root_profile: Optional[Profile] = None
+        self._marked = set()
+
+    async def mark(self, profile: Profile):
+        """Record that profile's tenant has background work."""
+        wallet_id = wallet_id_of(profile)
+        if not wallet_id or not self.root_profile or wallet_id in self._marked:
+            return
+
+        async with self.root_profile.session() as session:
+            storage = session.inject(BaseStorage)
+            try:
+                await storage.get_record(TENANT_RECORD_TYPE, wallet_id)
+            except StorageNotFoundError:
+                await storage.add_record(
+                    StorageRecord(TENANT_RECORD_TYPE, "{}", id=wallet_id)
+                )
+        self._marked.add(wallet_id)
+
+    async def unmark(self, wallet_id: str):
+        """Forget that a tenant has background work."""
+        self._marked.discard(wallet_id)
+        async with self.root_profile.session() as session:
+            storage = session.inject(BaseStorage)
+            try:
+                record = await storage.get_record(TENANT_RECORD_TYPE, wallet_id)
+                await storage.delete_record(record)
+            except StorageNotFoundError:
+                pass
+
+    async def profiles(self) -> List[Profile]:
+        """Open the profiles of marked tenants.
+
+        Tenant profiles are opened through the multitenant manager, which
+        shares ledger connections and caches open profiles.
+        """
+        manager = self.root_profile.inject_or(BaseMultitenantManager)
+        if not manager:
+            return []
+
+        async with self.root_profile.session() as session:
+            markers = await session.inject(BaseStorage).find_all_records(
+                TENANT_RECORD_TYPE
+            )
+
+        profiles = []
+        for marker in markers:
+            try:
+                async with self.root_profile.session() as session:
+                    wallet_record = await WalletRecord.retrieve_by_id(session, marker.id)
+                profiles.append(
+                    await manager.get_wallet_profile(
+                        self.root_profile.context, wallet_record
+                    )
+                )
+                self._marked.add(marker.id)
+            except StorageNotFoundError:
+                LOGGER.warning("Dropping did:indy work of removed tenant %s", marker.id)
+                await self.unmark(marker.id)
+        return profiles
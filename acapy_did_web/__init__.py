@@ -1,7 +1,10 @@
 """DID Web."""
 from os import getenv
-from aries_cloudagent.config.injection_context import InjectionContext
-from aries_cloudagent.wallet.did_method import DIDMethods
+from acapy_agent.config.injection_context import InjectionContext
+from acapy_agent.core.event_bus import Event, EventBus
+from acapy_agent.core.profile import Profile
+from acapy_agent.core.util import SHUTDOWN_EVENT_PATTERN
+from acapy_agent.wallet.did_method import DIDMethods
 
 from .did import WEB
 from .client import DidWebServerClient
@@ -16,5 +19,13 @@ async def setup(context: InjectionContext):
         raise ValueError("Failed to load did:web server base url")
 
     context.injector.bind_instance(
-        DidWebServerClient, DidWebServerClient(server_base_url)
+        DidWebServerClient, DidWebServerClient.from_config(server_base_url, config)
     )
+
+    event_bus = context.inject(EventBus)
+    event_bus.subscribe(SHUTDOWN_EVENT_PATTERN, on_shutdown)
+
+
+async def on_shutdown(profile: Profile, event: Event):
+    """Close the did:web server client."""
+    await profile.inject(DidWebServerClient).close()
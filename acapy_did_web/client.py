@@ -1,22 +1,167 @@
 """DID Web Server client."""
-from aiohttp import ClientSession
+import asyncio
+import json
+import random
+from typing import Dict, Mapping, Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
 
 class DidWebServerClientError(Exception):
     """Raised on errors in the client."""
 
 
 class DidWebServerClient:
-    """Client to DID Web Server."""
+    """Client to DID Web Server.
 
-    def __init__(self, base_url: str):
+    One session, and so one pool of keep-alive connections, is shared by every
+    request until the client is closed. A connections_per_host of 0 does not
+    limit connections.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float = 30,
+        retries: int = 3,
+        retry_delay: float = 0.5,
+        connections_per_host: int = 20,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        batch_size: int = 500,
+    ):
         """Init the client."""
+        if batch_size < 1:
+            raise DidWebServerClientError(
+                f"batch_size must be at least 1, not {batch_size}"
+            )
+        if connections_per_host < 0:
+            raise DidWebServerClientError(
+                f"connections_per_host must not be negative, not {connections_per_host}"
+            )
         self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.connections_per_host = connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.batch_size = batch_size
+        self._session: Optional[ClientSession] = None
+
+    @classmethod
+    def from_config(cls, base_url: str, config) -> "DidWebServerClient":
+        """Create a client from plugin settings."""
+        def _get(name: str, convert, default):
+            value = config.get(name)
+            return default if value is None else convert(value)
+
+        return cls(
+            base_url,
+            timeout=_get("request_timeout", float, 30),
+            retries=_get("request_retries", int, 3),
+            retry_delay=_get("retry_delay", float, 0.5),
+            connections_per_host=_get("connections_per_host", int, 20),
+            keepalive_timeout=_get("keepalive_timeout", float, 30),
+            dns_cache_ttl=_get("dns_cache_ttl", int, 300),
+            batch_size=_get("batch_size", int, 500),
+        )
+
+    @property
+    def session(self) -> ClientSession:
+        """Return the shared session, opening it on first use."""
+        if not self._session or self._session.closed:
+            self._session = ClientSession(
+                self.base_url,
+                connector=TCPConnector(
+                    limit_per_host=self.connections_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    use_dns_cache=True,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                timeout=ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its connections."""
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _put(self, path: str, body) -> str:
+        """PUT a JSON body, retrying failures with backoff; return the response text.
+
+        PUT is idempotent so connection errors, timeouts and overload responses
+        are retried up to retries times.
+        """
+        for attempt in range(self.retries + 1):
+            retry = attempt < self.retries
+            try:
+                async with self.session.put(path, json=body) as resp:
+                    text = await resp.text()
+                    if resp.ok:
+                        return text
+                    if not retry or resp.status not in RETRY_STATUSES:
+                        raise DidWebServerClientError(
+                            "Failed to put the document: " + text
+                        )
+            except (ClientError, asyncio.TimeoutError) as error:
+                if not retry:
+                    raise DidWebServerClientError(
+                        f"Failed to put the document: {error}"
+                    ) from error
+
+            delay = self.retry_delay * 2**attempt
+            await asyncio.sleep(delay / 2 + random.random() * delay / 2)
+
+        raise DidWebServerClientError("Failed to put the document")
 
     async def put_did(self, name: str, document: dict):
         """Put the DID at the named location on the server."""
-        async with ClientSession(self.base_url) as session:
-            async with session.put(f"/did/{name}", json=document) as resp:
-                if not resp.ok:
-                    raise DidWebServerClientError(
-                        "Failed to put the document: " + await resp.text()
+        await self._put(f"/did/{name}", document)
+
+    async def put_dids(
+        self, documents: Mapping[str, dict]
+    ) -> Dict[str, Optional[str]]:
+        """Put many DIDs at their named locations on the server.
+
+        Documents are sent in chunks of up to batch_size, with up to
+        connections_per_host chunks in flight. Returns a mapping of name to
+        None if stored or the reason it was not; a chunk that fails, or whose
+        response cannot be read, fails each of its names.
+        """
+        names = list(documents)
+        chunks = [
+            names[offset : offset + self.batch_size]
+            for offset in range(0, len(names), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.connections_per_host or len(chunks) or 1)
+        results: Dict[str, Optional[str]] = {}
+
+        async def _put_chunk(chunk):
+            async with semaphore:
+                try:
+                    text = await self._put(
+                        "/dids", {"documents": {name: documents[name] for name in chunk}}
                     )
+                except DidWebServerClientError as error:
+                    results.update(dict.fromkeys(chunk, str(error)))
+                    return
+            try:
+                chunk_results = {
+                    result["name"]: None if result["ok"] else result["error"]
+                    for result in json.loads(text)["results"]
+                }
+            except (ValueError, KeyError, TypeError) as error:
+                results.update(
+                    dict.fromkeys(chunk, f"Invalid response from server: {error!r}")
+                )
+                return
+            results.update(chunk_results)
+
+        await asyncio.gather(*(_put_chunk(chunk) for chunk in chunks))
+        return {name: results.get(name, "No result from server") for name in names}
@@ -4,12 +4,12 @@ from urllib.parse import urlparse
 
 from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
-from aries_cloudagent.admin.request_context import AdminRequestContext
-from aries_cloudagent.messaging.models.openapi import OpenAPISchema
-from aries_cloudagent.utils.multiformats import multibase, multicodec
-from aries_cloudagent.wallet.base import BaseWallet
-from aries_cloudagent.wallet.did_info import DIDInfo
-from aries_cloudagent.wallet.key_type import ED25519
+from acapy_agent.admin.request_context import AdminRequestContext
+from acapy_agent.messaging.models.openapi import OpenAPISchema
+from acapy_agent.utils.multiformats import multibase, multicodec
+from acapy_agent.wallet.base import BaseWallet
+from acapy_agent.wallet.did_info import DIDInfo
+from acapy_agent.wallet.key_type import ED25519
 import base58
 from marshmallow import fields
 from pydid import DIDDocumentBuilder
@@ -0,0 +1 @@
+"""Offline benchmarks for acapy_did_indy."""
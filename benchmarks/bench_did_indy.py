@@ -0,0 +1,313 @@
+"""Benchmark did:indy resolver and registrar hot paths against offline fakes.
+
+The ledger and resolver stand-ins in benchmarks.fakes simulate a round trip;
+wallets are in-memory test profiles. Run from the repository root
+with ``python -m benchmarks.bench_did_indy --output results.json``.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.ledger.error import LedgerError
+from acapy_agent.resolver.base import ResolverError
+from acapy_agent.wallet.error import WalletError
+
+from acapy_did_indy.cache import ResolutionCache
+from acapy_did_indy.registrar import IndyRegistrar
+from acapy_did_indy.resolver import IndyResolver
+
+from .fakes import FakeLedger, FakeVdrResolver, create_nyms, ledger_profile
+from .util import Latency, percentile, random_nym
+
+NAMESPACE = "indicio:test"
+EXPECTED_ERRORS = (LedgerError, ResolverError, WalletError)
+
+Call = Callable[[int], Awaitable[object]]
+
+
+async def measure(call: Call, calls: int, concurrency: int) -> dict:
+    """Run call for 0..calls-1 with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def _one(index: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(index)
+            except EXPECTED_ERRORS:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(index) for index in range(calls)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "throughput_per_s": calls / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def allocations(call: Call, calls: int) -> dict:
+    """Return memory use of sequential calls, measured with tracemalloc.
+
+    Retained figures are memory still allocated after the calls, such as cache
+    entries; the peak is the most traced memory in use at once.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for index in range(calls):
+            try:
+                await call(index)
+            except EXPECTED_ERRORS:
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "lineno")
+    return {
+        "calls": calls,
+        "retained_blocks_per_call": sum(max(0, s.count_diff) for s in diff) / calls,
+        "retained_bytes_per_call": sum(max(0, s.size_diff) for s in diff) / calls,
+        "peak_bytes": peak - base,
+    }
+
+
+def resolver(known: set, latency: Latency) -> IndyResolver:
+    """Return a resolver reading from a fake ledger."""
+    indy = IndyResolver()
+    indy.cache = ResolutionCache(ttl=300, max_entries=len(known) * 2 or 1)
+    indy._resolver = FakeVdrResolver(known, latency.wait)
+    return indy
+
+
+def dids(count: int, rng: random.Random) -> List[str]:
+    """Return count random did:indy DIDs."""
+    return [f"did:indy:{NAMESPACE}:{random_nym(rng)}" for _ in range(count)]
+
+
+async def bench_resolve(args: argparse.Namespace, rng: random.Random) -> dict:
+    """Benchmark resolution of distinct DIDs, then of a skewed hot set."""
+    results = {"cold": [], "hot": []}
+    for concurrency in args.concurrency:
+        known = dids(args.calls, rng)
+        indy = resolver(set(known), Latency(args.latency, args.jitter, args.error_rate))
+        results["cold"].append(
+            await measure(lambda i: indy._resolve(None, known[i]), args.calls, concurrency)
+        )
+
+        hot = dids(max(1, args.calls // 20), rng)
+        indy = resolver(set(hot), Latency(args.latency, args.jitter, args.error_rate))
+        picks = [hot[min(int(rng.paretovariate(1.2)) - 1, len(hot) - 1)] for _ in known]
+        result = await measure(
+            lambda i: indy._resolve(None, picks[i]), args.calls, concurrency
+        )
+        stats = indy.cache.stats()
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        result["cache_hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        result["coalesced"] = indy.in_flight.coalesced
+        result["ledger_reads"] = indy._resolver.lookups
+        results["hot"].append(result)
+
+    known = dids(args.alloc_calls, rng)
+    indy = resolver(set(known), Latency(0, 0))
+    results["cold_allocations"] = await allocations(
+        lambda i: indy._resolve(None, known[i]), args.alloc_calls
+    )
+    results["hot_allocations"] = await allocations(
+        lambda i: indy._resolve(None, known[0]), args.alloc_calls
+    )
+    return results
+
+
+async def registrar_setup(args: argparse.Namespace, count: int, latency: Latency):
+    """Return a registrar, profile and nyms stored in the profile's wallet."""
+    registrar = IndyRegistrar(
+        Settings(
+            {
+                "plugin_config": {
+                    "acapy_did_indy": {
+                        "indy_namespace": NAMESPACE,
+                        "diddoc_content_write": args.write_mode,
+                        "ledger_write_max_attempts": 0,
+                        "ldp_vc_key_pool_size": args.key_pool_size,
+                    }
+                }
+            }
+        )
+    )
+    profile = await ledger_profile(
+        FakeLedger(wait=latency.wait), {"default_endpoint": "https://agent.example"}
+    )
+    nyms = await create_nyms(profile, count)
+    return registrar, profile, nyms
+
+
+async def bench_register(args: argparse.Namespace, rng: random.Random) -> dict:
+    """Benchmark from_public_nym with and without LDP-VC keys."""
+    results: Dict[str, list | dict] = {"didcomm": [], "ldp_vc": []}
+    for concurrency in args.concurrency:
+        for variant, ldp_vc in (("didcomm", False), ("ldp_vc", True)):
+            registrar, profile, nyms = await registrar_setup(
+                args,
+                args.calls,
+                Latency(args.latency, args.jitter, args.error_rate),
+            )
+            registrar.keys.refill(profile)
+            await asyncio.gather(*registrar.keys._refills.values())
+            results[variant].append(
+                await measure(
+                    lambda i: registrar.from_public_nym(
+                        profile, nyms[i], ldp_vc=ldp_vc
+                    ),
+                    args.calls,
+                    concurrency,
+                )
+            )
+
+    registrar, profile, nyms = await registrar_setup(
+        args, args.alloc_calls, Latency(0, 0)
+    )
+    results["allocations"] = await allocations(
+        lambda i: registrar.from_public_nym(profile, nyms[i], ldp_vc=True),
+        args.alloc_calls,
+    )
+    return results
+
+
+async def bench_services(args: argparse.Namespace, rng: random.Random) -> dict:
+    """Benchmark prepare_didcomm_services when memoized and when not."""
+    registrar, profile, _ = await registrar_setup(args, 0, Latency(0, 0))
+    calls = args.alloc_calls
+
+    async def _memoized(index: int):
+        await registrar.prepare_didcomm_services(profile)
+
+    async def _unmemoized(index: int):
+        registrar._services.clear()
+        await registrar.prepare_didcomm_services(profile)
+
+    return {
+        "memoized": await measure(_memoized, calls, 1),
+        "unmemoized": await measure(_unmemoized, calls, 1),
+        "memoized_allocations": await allocations(_memoized, calls),
+    }
+
+
+BENCHMARKS = {
+    "resolve": bench_resolve,
+    "register": bench_register,
+    "services": bench_services,
+}
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=sorted(BENCHMARKS),
+        help="Benchmark to run; may be repeated; defaults to all",
+    )
+    parser.add_argument("--calls", type=int, default=1000, help="Calls per run")
+    parser.add_argument(
+        "--alloc-calls",
+        type=int,
+        default=200,
+        help="Sequential calls traced to measure allocations",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 10, 100],
+        help="Comma separated concurrency levels",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=50, help="Mean ledger round trip in ms"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=10, help="Ledger round trip deviation in ms"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of ledger calls failing"
+    )
+    parser.add_argument(
+        "--write-mode",
+        default="both",
+        choices=["auto", "nym", "attrib", "both"],
+        help="diddoc_content_write mode used by the registrar",
+    )
+    parser.add_argument(
+        "--key-pool-size",
+        type=int,
+        default=0,
+        help="ldp_vc_key_pool_size used by the registrar",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+    args.latency /= 1000
+    args.jitter /= 1000
+    return args
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the selected benchmarks and return their results."""
+    rng = random.Random(args.seed)
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "calls": args.calls,
+            "alloc_calls": args.alloc_calls,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency * 1000,
+            "jitter_ms": args.jitter * 1000,
+            "error_rate": args.error_rate,
+            "write_mode": args.write_mode,
+            "key_pool_size": args.key_pool_size,
+            "seed": args.seed,
+        },
+        "benchmarks": {},
+    }
+    for name in args.benchmark or BENCHMARKS:
+        results["benchmarks"][name] = await BENCHMARKS[name](args, rng)
+    return results
+
+
+def main(argv: Sequence[str] | None = None):
+    """Run benchmarks from the command line."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
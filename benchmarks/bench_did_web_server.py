@@ -0,0 +1,164 @@
+"""Benchmark did:web server document writes.
+
+Compares the write path of PUT /did/{name}, which parses the body once and
+stores it as sent, with the previous handler, which parsed the body into a
+dict parameter, parsed it again with request.json() and re-serialized it.
+
+Run with ``python -m benchmarks.bench_did_web_server --output results.json``.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from typing import List, Sequence
+
+from fastapi import Body, FastAPI, Request
+import httpx
+
+import did_web_server
+from did_web_server.storage import MemoryDocumentStore
+
+from .util import percentile
+
+
+def legacy_app() -> FastAPI:
+    """Return an app with the previous PUT /did/{name} handler."""
+    app = FastAPI()
+    store = MemoryDocumentStore()
+
+    @app.put("/did/{name}")
+    async def put_did(request: Request, name: str, document: dict = Body()):
+        document = await request.json()
+        store.put(name, did_web_server.serialize(document))
+
+    return app
+
+
+def document(name: str, verification_methods: int) -> bytes:
+    """Return a did:web document with verification_methods keys."""
+    did = f"did:web:example.com:{name}"
+    methods = [
+        {
+            "id": f"{did}#key-{index}",
+            "type": "Ed25519VerificationKey2020",
+            "controller": did,
+            "publicKeyMultibase": "z6Mk" + f"{index:040d}",
+        }
+        for index in range(verification_methods)
+    ]
+    return json.dumps(
+        {
+            "@context": [
+                "https://www.w3.org/ns/did/v1",
+                "https://w3id.org/security/suites/ed25519-2020/v1",
+            ],
+            "id": did,
+            "verificationMethod": methods,
+            "authentication": [method["id"] for method in methods],
+            "assertionMethod": [method["id"] for method in methods],
+        }
+    ).encode()
+
+
+async def measure(app: FastAPI, body: bytes, calls: int, concurrency: int) -> dict:
+    """PUT body calls times with at most concurrency requests in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Content-Type": "application/json"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def _one(index: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.put(
+                    f"/did/doc-{index}", content=body, headers=headers
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_one(index) for index in range(calls)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "throughput_per_s": calls / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000, help="Writes per run")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 16],
+        help="Comma separated concurrency levels",
+    )
+    parser.add_argument(
+        "--verification-methods",
+        type=lambda value: [int(count) for count in value.split(",")],
+        default=[1, 10, 100],
+        help="Comma separated verification method counts per document",
+    )
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the write benchmarks and return their results."""
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "calls": args.calls,
+            "concurrency": args.concurrency,
+            "verification_methods": args.verification_methods,
+        },
+        "benchmarks": [],
+    }
+    for count in args.verification_methods:
+        body = document("bench", count)
+        for concurrency in args.concurrency:
+            did_web_server.storage = MemoryDocumentStore()
+            current = await measure(did_web_server.app, body, args.calls, concurrency)
+            legacy = await measure(legacy_app(), body, args.calls, concurrency)
+            results["benchmarks"].append(
+                {
+                    "verification_methods": count,
+                    "document_bytes": len(body),
+                    "current": current,
+                    "legacy": legacy,
+                    "speedup": (
+                        current["throughput_per_s"] / legacy["throughput_per_s"]
+                        if legacy["throughput_per_s"]
+                        else 0.0
+                    ),
+                }
+            )
+    return results
+
+
+def main(argv: Sequence[str] | None = None):
+    """Run benchmarks from the command line."""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
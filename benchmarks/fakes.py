@@ -0,0 +1,97 @@
+"""Offline stand-ins for the ledger and resolver used by benchmarks."""
+
+import json
+from typing import Awaitable, Callable
+from unittest import mock
+
+from acapy_agent.core.profile import Profile
+from acapy_agent.ledger.base import BaseLedger
+from acapy_agent.ledger.error import LedgerTransactionError
+from acapy_agent.protocols.coordinate_mediation.v1_0.route_manager import (
+    RouteManager,
+)
+from acapy_agent.utils.testing import create_test_profile
+from acapy_agent.wallet.base import BaseWallet
+from acapy_agent.wallet.did_method import SOV, DIDMethods
+from acapy_agent.wallet.key_type import ED25519, KeyTypes
+from indy_vdr import VdrError, VdrErrorCode
+
+from acapy_did_indy.did import INDY
+
+Wait = Callable[[], Awaitable[bool]]
+"""Simulated round trip to a ledger; returns whether the request should fail."""
+
+
+def pool_timeout() -> LedgerTransactionError:
+    """Return the error ACA-Py raises for a ledger write timing out."""
+    try:
+        raise LedgerTransactionError("Ledger request error") from VdrError(
+            VdrErrorCode.POOL_TIMEOUT, "Request timed out"
+        )
+    except LedgerTransactionError as error:
+        return error
+
+
+class FakeVdrResolver:
+    """Stand-in for indy_vdr.Resolver answering from a set of known DIDs."""
+
+    def __init__(self, known: set, wait: Wait):
+        self.known = known
+        self.wait = wait
+        self.lookups = 0
+        self.ledgers = {}
+
+    def add_ledger(self, namespace: str, pool):
+        self.ledgers[namespace] = pool
+
+    async def resolve(self, did: str) -> dict:
+        self.lookups += 1
+        if await self.wait():
+            raise VdrError(VdrErrorCode.POOL_TIMEOUT, "Request timed out")
+        if did not in self.known:
+            raise VdrError(VdrErrorCode.RESOLVER, "Object not found")
+        return {"didDocument": {"id": did}}
+
+
+class FakeLedger:
+    """Stand-in for BaseLedger accepting writes after a simulated round trip."""
+
+    def __init__(self, wait: Wait):
+        self.wait = wait
+        self.written = 0
+
+    async def txn_submit(
+        self, txn, sign, sign_did=None, write_ledger=True, taa_accept=None
+    ):
+        body = json.loads(txn if isinstance(txn, str) else txn.body)
+        operation = body["operation"]
+        if await self.wait():
+            raise pool_timeout()
+        self.written += 1
+        txn = {"type": operation["type"], "data": {"dest": operation["dest"]}}
+        return json.dumps({"op": "REPLY", "result": {"txn": txn}})
+
+
+async def ledger_profile(ledger: FakeLedger, settings: dict | None = None) -> Profile:
+    """Return an in-memory profile writing to ledger, with no mediation."""
+    profile = await create_test_profile(settings)
+    did_methods = DIDMethods()
+    did_methods.register(INDY)
+    profile.context.injector.bind_instance(DIDMethods, did_methods)
+    profile.context.injector.bind_instance(KeyTypes, KeyTypes())
+    base_ledger = mock.MagicMock(BaseLedger, autospec=True)
+    base_ledger.txn_submit = ledger.txn_submit
+    profile.context.injector.bind_instance(BaseLedger, base_ledger)
+    route_manager = mock.MagicMock(RouteManager, autospec=True)
+    route_manager.mediation_record_if_id = mock.AsyncMock(return_value=None)
+    profile.context.injector.bind_instance(RouteManager, route_manager)
+    return profile
+
+
+async def create_nyms(profile: Profile, count: int) -> list:
+    """Create count nyms in the profile's wallet."""
+    async with profile.session() as session:
+        wallet = session.inject(BaseWallet)
+        return [
+            (await wallet.create_local_did(SOV, ED25519)).did for _ in range(count)
+        ]
@@ -0,0 +1,42 @@
+"""Helpers shared by benchmarks."""
+
+import asyncio
+import random
+from typing import Optional, Sequence
+
+import base58
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class Latency:
+    """Simulated network behaviour of a ledger."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.01,
+        error_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        """Initialize the simulation; latencies are in seconds."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = rng or random.Random(0)
+
+    async def wait(self) -> bool:
+        """Sleep for one round trip; return whether it should fail."""
+        await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+        return self.rng.random() < self.error_rate
+
+
+def random_nym(rng: random.Random) -> str:
+    """Return a random nym of 16 bytes."""
+    return base58.b58encode(rng.randbytes(16)).decode()
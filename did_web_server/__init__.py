@@ -1,24 +1,157 @@
 """Simple DID Web Server implementation."""
 
-from typing import MutableMapping
-from fastapi import Body, FastAPI, Request, HTTPException
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+import json
+from os import getenv
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Header, Request, HTTPException, Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-app = FastAPI(title="DID Web Server", description="A simple DID Web Server.")
+from .storage import DocumentStore, StoredDocument, store_from_env
 
-storage: MutableMapping[str, dict] = {}
+storage: DocumentStore = store_from_env()
+cache_control = getenv("DID_WEB_SERVER_CACHE_CONTROL", "public, max-age=60")
 
 
-@app.put("/did/{name}")
-async def put_did(request: Request, name: str, document: dict = Body()):
-    """Store the DID Document at the named location."""
-    document = await request.json()
-    storage[name] = document
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close storage on shutdown."""
+    yield
+    storage.close()
+
+
+app = FastAPI(
+    title="DID Web Server", description="A simple DID Web Server.", lifespan=lifespan
+)
+
+
+def serialize(document: dict) -> StoredDocument:
+    """Serialize a DID Document for storage."""
+    return StoredDocument.create(json.dumps(document, separators=(",", ":")).encode())
+
+
+def document_error(document: Any) -> Optional[str]:
+    """Return why document is not a minimal DID Document, or None if it is."""
+    if not isinstance(document, dict):
+        return "Document must be an object"
+    if not isinstance(document.get("id"), str):
+        return "Document must have a string id"
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return whether an If-None-Match header matches etag."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified_since(if_modified_since: str, modified: int) -> bool:
+    """Return whether a document modified at modified is older than the header."""
+    try:
+        return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class PutDIDsRequest(BaseModel):
+    """Many DID Documents keyed by named location."""
+
+    documents: Dict[str, Any]
+
+
+class PutDIDResult(BaseModel):
+    """Result of storing one DID Document."""
+
+    name: str
+    ok: bool
+    error: Optional[str] = None
+
+
+class PutDIDsResponse(BaseModel):
+    """Results of storing many DID Documents, in request order."""
+
+    results: List[PutDIDResult]
+
+
+@app.put(
+    "/did/{name}",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"type": "object"}}},
+        }
+    },
+)
+async def put_did(request: Request, name: str):
+    """Store the DID Document at the named location.
+
+    The body is parsed once to check it is a DID Document and is then stored
+    byte for byte as sent.
+    """
+    body = await request.body()
+    try:
+        document = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Document is not valid JSON")
+    error = document_error(document)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    await run_in_threadpool(storage.put, name, StoredDocument.create(body))
+
+
+@app.put("/dids")
+async def put_dids(request: PutDIDsRequest) -> PutDIDsResponse:
+    """Store many DID Documents at their named locations.
+
+    Each document is stored independently; one that is invalid does not stop
+    the others from being stored.
+    """
+    results = []
+    stored = []
+    for name, document in request.documents.items():
+        error = document_error(document)
+        if error:
+            results.append(PutDIDResult(name=name, ok=False, error=error))
+            continue
+        stored.append((name, serialize(document)))
+        results.append(PutDIDResult(name=name, ok=True))
+    await run_in_threadpool(storage.put_many, stored)
+    return PutDIDsResponse(results=results)
 
 
 @app.get("/{name}/did.json")
-async def get_did_json(name: str) -> dict:
-    """Get the DID Document at the named location."""
-    doc = storage.get(name)
+async def get_did_json(
+    name: str,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+) -> Response:
+    """Get the DID Document at the named location.
+
+    The document is sent as stored, with validators so clients and caches can
+    revalidate it; a request with a matching validator gets 304 Not Modified.
+    """
+    doc = await run_in_threadpool(storage.get, name)
     if not doc:
         raise HTTPException(status_code=404, detail="DID Not Found")
-    return doc
+
+    headers = {
+        "ETag": doc.etag,
+        "Last-Modified": formatdate(doc.modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, doc.etag)
+    elif if_modified_since is not None:
+        not_modified = not_modified_since(if_modified_since, doc.modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=doc.body, media_type="application/json", headers=headers)
@@ -0,0 +1,154 @@
+"""Storage backends for DID Documents."""
+
+from abc import ABC, abstractmethod
+import hashlib
+from os import getenv
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class StoredDocument(NamedTuple):
+    """A serialized DID Document with its validators."""
+
+    body: bytes
+    etag: str
+    modified: int
+
+    @classmethod
+    def create(cls, body: bytes, modified: Optional[int] = None) -> "StoredDocument":
+        """Wrap serialized document bytes, computing their strong ETag."""
+        return cls(
+            body,
+            f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            int(time.time()) if modified is None else modified,
+        )
+
+
+class DocumentStore(ABC):
+    """Store serialized DID Documents by named location."""
+
+    @abstractmethod
+    def get(self, name: str) -> Optional[StoredDocument]:
+        """Return the document at name, if any."""
+
+    @abstractmethod
+    def put(self, name: str, document: StoredDocument):
+        """Store a document at name."""
+
+    def put_many(self, documents: Iterable[Tuple[str, StoredDocument]]):
+        """Store many serialized documents."""
+        for name, document in documents:
+            self.put(name, document)
+
+    def close(self):
+        """Release resources held by the store."""
+
+
+class MemoryDocumentStore(DocumentStore):
+    """Keep documents in process memory; they are lost on restart."""
+
+    def __init__(self):
+        """Initialize the store."""
+        self.documents: Dict[str, StoredDocument] = {}
+
+    def get(self, name: str) -> Optional[StoredDocument]:
+        """Return the document at name, if any."""
+        return self.documents.get(name)
+
+    def put(self, name: str, document: StoredDocument):
+        """Store a document at name."""
+        self.documents[name] = document
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """Keep documents in an SQLite database.
+
+    The database is in WAL mode so that any number of server processes can
+    read while one writes, and is memory-mapped so reads of hot documents are
+    served from the page cache without copying through read calls. Each thread
+    uses its own connection, so the store can be called from a thread pool.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        """Open or create the database at path."""
+        self.path = path
+        self.mmap_size = int(mmap_size)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents "
+            "(name TEXT PRIMARY KEY, document BLOB NOT NULL, "
+            "etag TEXT NOT NULL, modified INTEGER NOT NULL) WITHOUT ROWID"
+        )
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Return the connection of the calling thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only close() uses a connection from another thread
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, name: str) -> Optional[StoredDocument]:
+        """Return the document at name, if any."""
+        row = self.conn.execute(
+            "SELECT document, etag, modified FROM documents WHERE name = ?", (name,)
+        ).fetchone()
+        return StoredDocument(*row) if row else None
+
+    def put(self, name: str, document: StoredDocument):
+        """Store a document at name."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (name, document, etag, modified) "
+            "VALUES (?, ?, ?, ?)",
+            (name, *document),
+        )
+
+    def put_many(self, documents: Iterable[Tuple[str, StoredDocument]]):
+        """Store many documents in one transaction."""
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO documents (name, document, etag, modified) "
+                "VALUES (?, ?, ?, ?)",
+                ((name, *document) for name, document in documents),
+            )
+
+    def close(self):
+        """Close the database connections of every thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def store_from_env() -> DocumentStore:
+    """Create the store selected by DID_WEB_SERVER_STORAGE.
+
+    "memory" (the default) keeps documents in memory; "sqlite" keeps them in
+    the database at DID_WEB_SERVER_DB, memory-mapping up to
+    DID_WEB_SERVER_MMAP_SIZE bytes of it.
+    """
+    backend = getenv("DID_WEB_SERVER_STORAGE", "memory")
+    if backend == "memory":
+        return MemoryDocumentStore()
+    if backend == "sqlite":
+        return SQLiteDocumentStore(
+            getenv("DID_WEB_SERVER_DB", "did_web_server.db"),
+            mmap_size=int(getenv("DID_WEB_SERVER_MMAP_SIZE", 256 * 1024 * 1024)),
+        )
+    raise ValueError(f"Unknown DID_WEB_SERVER_STORAGE backend {backend}")
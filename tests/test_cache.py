@@ -0,0 +1,146 @@
+"""Test resolution cache."""
+
+import asyncio
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.utils.testing import create_test_profile
+
+from acapy_did_indy.cache import ResolutionCache, StorageResolutionCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hit_and_miss():
+    """Test hit and miss counters."""
+    cache = ResolutionCache()
+    assert cache.get("did:indy:test:abc") is None
+    cache.put("did:indy:test:abc", {"id": "did:indy:test:abc"})
+    entry = cache.get("did:indy:test:abc")
+    assert entry
+    assert entry.found
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expiry():
+    """Test entries expire after ttl; negative entries after negative_ttl."""
+    clock = FakeClock()
+    cache = ResolutionCache(ttl=10, negative_ttl=2, clock=clock)
+    cache.put("found", {"id": "found"})
+    cache.put_not_found("missing")
+
+    clock.now = 1
+    missing = cache.get("missing")
+    assert missing
+    assert not missing.found
+
+    clock.now = 3
+    assert cache.get("missing") is None
+    assert cache.get("found")
+
+    clock.now = 10
+    assert cache.get("found") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    """Test least recently used entries are evicted first."""
+    cache = ResolutionCache(max_entries=2)
+    cache.put("a", {"id": "a"})
+    cache.put("b", {"id": "b"})
+    assert cache.get("a")
+    cache.put("c", {"id": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a")
+    assert cache.get("c")
+
+
+def test_disabled():
+    """Test max_entries of 0 disables caching."""
+    cache = ResolutionCache(max_entries=0)
+    cache.put("a", {"id": "a"})
+    assert cache.get("a") is None
+
+
+def test_from_settings_defaults():
+    """Test unset plugin settings fall back to their defaults."""
+    cache = ResolutionCache.from_settings(Settings({}).for_plugin("acapy_did_indy"))
+    assert (cache.ttl, cache.negative_ttl, cache.max_entries, cache.max_stale) == (
+        300,
+        30,
+        1024,
+        0,
+    )
+    cache.put("a", {"id": "a"})
+    assert cache.get("a")
+
+
+def test_from_settings():
+    """Test plugin settings configure the cache, including 0 values."""
+    cache = ResolutionCache.from_settings(
+        Settings(
+            {
+                "plugin_config": {
+                    "acapy_did_indy": {
+                        "cache_ttl": "60",
+                        "cache_max_entries": 0,
+                        "stale_while_revalidate": True,
+                    }
+                }
+            }
+        ).for_plugin("acapy_did_indy")
+    )
+    assert (cache.ttl, cache.max_entries, cache.max_stale) == (60, 0, 3600)
+    assert not cache.enabled
+
+
+def test_stale_entries():
+    """Test found entries are served stale up to max_stale past expiry."""
+    clock = FakeClock()
+    cache = ResolutionCache(ttl=10, negative_ttl=10, max_stale=5, clock=clock)
+    cache.put("found", {"id": "found"})
+    cache.put_not_found("missing")
+
+    clock.now = 12
+    entry = cache.get("found")
+    assert entry
+    assert cache.is_stale(entry)
+    assert cache.get("missing") is None
+    assert cache.stats()["stale_hits"] == 1
+
+    clock.now = 15
+    assert cache.get("found") is None
+
+
+def test_storage_cache_from_settings():
+    """Test the storage cache is created when enabled, with its default ttl."""
+    assert StorageResolutionCache.from_settings(Settings({})) is None
+    cache = StorageResolutionCache.from_settings(Settings({"persistent_cache": True}))
+    assert cache
+    assert cache.ttl == 3600
+
+
+def test_storage_cache():
+    """Test documents round trip through storage until they expire."""
+    clock = FakeClock()
+    cache = StorageResolutionCache(ttl=10, clock=clock)
+
+    async def run():
+        cache.profile = await create_test_profile()
+        assert await cache.get("did") is None
+        await cache.put("did", {"id": "did"}, seq_no=5, txn_time=100)
+        await cache.put("did", {"id": "did", "updated": True}, seq_no=6, txn_time=200)
+        assert await cache.get("did") == {"id": "did", "updated": True}
+        clock.now = 10
+        assert await cache.get("did") is None
+
+    asyncio.run(run())
+    assert cache.stats() == {"hits": 1, "misses": 2}
@@ -0,0 +1,177 @@
+"""Test DID Web Server client."""
+
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from acapy_did_web.client import (
+    DidWebServerClient,
+    DidWebServerClientError,
+)
+
+
+class FakeServer:
+    """DID Web Server answering PUTs with a scripted list of statuses."""
+
+    def __init__(self, statuses: list):
+        self.statuses = statuses
+        self.requests = []
+        self.chunks = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def put_did(self, request: web.Request) -> web.Response:
+        self.requests.append(time.monotonic())
+        status = self.statuses.pop(0) if self.statuses else 200
+        return web.Response(status=status, text=f"status {status}")
+
+    async def put_dids(self, request: web.Request) -> web.Response:
+        documents = (await request.json())["documents"]
+        self.chunks.append(list(documents))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "fail" in documents:
+            return web.Response(status=400, text="bad chunk")
+        if "garbled" in documents:
+            return web.Response(text="<html>not json</html>")
+        return web.json_response(
+            {
+                "results": [
+                    {"name": name, "ok": False, "error": "invalid document"}
+                    if name == "invalid"
+                    else {"name": name, "ok": True}
+                    for name in documents
+                ]
+            }
+        )
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_put("/did/{name}", self.put_did)
+        app.router.add_put("/dids", self.put_dids)
+        return app
+
+
+async def put_did(server: FakeServer, **options):
+    """PUT a document to server with a client using options."""
+    async with TestServer(server.app()) as test_server:
+        client = DidWebServerClient(
+            f"http://{test_server.host}:{test_server.port}", **options
+        )
+        try:
+            await client.put_did("alice", {"id": "did:web:example.com:alice"})
+        finally:
+            await client.close()
+
+
+def test_from_config():
+    """Test unset settings fall back to defaults and zero may be configured."""
+    defaults = DidWebServerClient.from_config("http://server", {})
+    assert (defaults.retries, defaults.retry_delay, defaults.batch_size) == (3, 0.5, 500)
+
+    zero = DidWebServerClient.from_config(
+        "http://server", {"request_retries": 0, "retry_delay": 0}
+    )
+    assert (zero.retries, zero.retry_delay) == (0, 0)
+
+    with pytest.raises(DidWebServerClientError, match="batch_size"):
+        DidWebServerClient.from_config("http://server", {"batch_size": 0})
+    with pytest.raises(DidWebServerClientError, match="connections_per_host"):
+        DidWebServerClient.from_config("http://server", {"connections_per_host": -1})
+
+
+def test_put_retries_with_backoff():
+    """Test overload responses are retried with a doubling delay."""
+    server = FakeServer([503, 502])
+    asyncio.run(put_did(server, retry_delay=0.02))
+
+    first, second, third = server.requests
+    assert len(server.requests) == 3
+    assert second - first >= 0.01
+    assert third - second >= 0.02
+
+
+def test_put_gives_up():
+    """Test retries stop after retries attempts or on other errors."""
+    server = FakeServer([503, 503, 503])
+    with pytest.raises(DidWebServerClientError, match="status 503"):
+        asyncio.run(put_did(server, retries=2, retry_delay=0))
+    assert len(server.requests) == 3
+
+    server = FakeServer([400])
+    with pytest.raises(DidWebServerClientError, match="status 400"):
+        asyncio.run(put_did(server, retry_delay=0))
+    assert len(server.requests) == 1
+
+    server = FakeServer([503])
+    with pytest.raises(DidWebServerClientError):
+        asyncio.run(put_did(server, retries=0))
+    assert len(server.requests) == 1
+
+
+def test_put_retries_connection_errors():
+    """Test connection errors are retried and reported once retries run out."""
+
+    async def run():
+        client = DidWebServerClient("http://127.0.0.1:9", retries=1, retry_delay=0)
+        try:
+            await client.put_did("alice", {})
+        finally:
+            await client.close()
+
+    with pytest.raises(DidWebServerClientError, match="Failed to put the document"):
+        asyncio.run(run())
+
+
+async def put_dids(server: FakeServer, names: list, **options) -> dict:
+    """PUT an empty document for each of names with a client using options."""
+    async with TestServer(server.app()) as test_server:
+        client = DidWebServerClient(
+            f"http://{test_server.host}:{test_server.port}", **options
+        )
+        try:
+            return await client.put_dids({name: {} for name in names})
+        finally:
+            await client.close()
+
+
+def test_put_dids_chunks():
+    """Test documents are sent in chunks with results reported per name."""
+    server = FakeServer([])
+    names = ["a", "b", "invalid", "c", "fail", "d", "e"]
+
+    results = asyncio.run(put_dids(server, names, batch_size=2, connections_per_host=2))
+    assert sorted(server.chunks) == [["a", "b"], ["e"], ["fail", "d"], ["invalid", "c"]]
+    assert server.max_in_flight == 2
+    assert list(results) == names
+    assert results["invalid"] == "invalid document"
+    assert "bad chunk" in results["fail"]
+    assert "bad chunk" in results["d"]
+    assert [results[name] for name in ("a", "b", "c", "e")] == [None] * 4
+
+
+def test_put_dids_invalid_response():
+    """Test a chunk whose response cannot be read fails its names only."""
+    server = FakeServer([])
+    names = ["a", "garbled", "b", "c"]
+
+    results = asyncio.run(put_dids(server, names, batch_size=2))
+    assert "Invalid response from server" in results["a"]
+    assert "Invalid response from server" in results["garbled"]
+    assert results["b"] is None
+    assert results["c"] is None
+
+
+def test_put_dids_unlimited_connections():
+    """Test a connections_per_host of 0 sends every chunk at once."""
+    server = FakeServer([])
+    names = ["a", "b", "c", "d", "e"]
+
+    results = asyncio.run(put_dids(server, names, batch_size=1, connections_per_host=0))
+    assert results == dict.fromkeys(names)
+    assert server.max_in_flight == 5
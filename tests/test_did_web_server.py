@@ -0,0 +1,158 @@
+"""Test did:web server routes."""
+
+import json
+
+from fastapi.testclient import TestClient
+import pytest
+
+import did_web_server
+from did_web_server import document_error, etag_matches, not_modified_since
+from did_web_server.storage import MemoryDocumentStore, StoredDocument
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryDocumentStore()
+    monkeypatch.setattr(did_web_server, "storage", store)
+    yield store
+
+
+@pytest.fixture
+def client(store):
+    yield TestClient(did_web_server.app)
+
+
+def test_put_dids(client, store):
+    """Test each valid document is stored and invalid ones are reported by name."""
+    alice = {"id": "did:web:example.com:alice"}
+    response = client.put(
+        "/dids",
+        json={"documents": {"alice": alice, "bob": {"service": []}, "carol": []}},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"name": "alice", "ok": True, "error": None},
+            {"name": "bob", "ok": False, "error": "Document must have a string id"},
+            {"name": "carol", "ok": False, "error": "Document must be an object"},
+        ]
+    }
+    assert json.loads(store.get("alice").body) == alice
+    assert store.get("bob") is None
+    assert store.get("carol") is None
+
+
+def test_put_dids_invalid_request(client, store):
+    """Test a body without a documents object is rejected."""
+    assert client.put("/dids", json={"alice": {}}).status_code == 422
+    assert client.put("/dids", json={"documents": []}).status_code == 422
+
+
+def test_put_did(client, store):
+    """Test a document is stored byte for byte as sent."""
+    body = b'{ "id": "did:web:example.com:alice",\n  "service": [] }'
+    response = client.put(
+        "/did/alice", content=body, headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 200
+    assert store.get("alice").body == body
+
+    assert client.get("/alice/did.json").content == body
+
+
+@pytest.mark.parametrize(
+    ("body", "detail"),
+    [
+        (b"{not json", "Document is not valid JSON"),
+        (b"", "Document is not valid JSON"),
+        (b'["did:web:example.com:alice"]', "Document must be an object"),
+        (b'"did:web:example.com:alice"', "Document must be an object"),
+        (b'{"service": []}', "Document must have a string id"),
+        (b'{"id": 1}', "Document must have a string id"),
+    ],
+)
+def test_put_did_invalid(client, store, body, detail):
+    """Test bodies that are not a DID Document are rejected and not stored."""
+    response = client.put(
+        "/did/alice", content=body, headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+    assert store.get("alice") is None
+
+
+def test_get_did_json(client, store):
+    """Test documents are served as stored with their validators."""
+    body = b'{ "id": "did:web:example.com:alice",\n  "service": [] }'
+    store.put("alice", StoredDocument.create(body, 1700000000))
+
+    response = client.get("/alice/did.json")
+    assert response.status_code == 200
+    assert response.content == body
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == store.get("alice").etag
+    assert response.headers["last-modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    assert response.headers["cache-control"] == did_web_server.cache_control
+
+    assert client.get("/bob/did.json").status_code == 404
+
+
+@pytest.mark.parametrize(
+    ("headers", "status"),
+    [
+        ({"If-None-Match": "ETAG"}, 304),
+        ({"If-None-Match": 'W/"other", ETAG'}, 304),
+        ({"If-None-Match": "*"}, 304),
+        ({"If-None-Match": '"other"'}, 200),
+        ({"If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"}, 304),
+        ({"If-Modified-Since": "Tue, 14 Nov 2023 22:13:19 GMT"}, 200),
+        ({"If-Modified-Since": "not a date"}, 200),
+        (
+            {
+                "If-None-Match": '"other"',
+                "If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT",
+            },
+            200,
+        ),
+    ],
+)
+def test_get_did_json_conditional(client, store, headers, status):
+    """Test matching validators get 304 Not Modified; If-None-Match wins."""
+    document = StoredDocument.create(b'{"id":"did:web:example.com:alice"}', 1700000000)
+    store.put("alice", document)
+    headers = {
+        name: value.replace("ETAG", document.etag) for name, value in headers.items()
+    }
+
+    response = client.get("/alice/did.json", headers=headers)
+    assert response.status_code == status
+    assert response.headers["etag"] == document.etag
+    assert response.content == (b"" if status == 304 else document.body)
+
+
+def test_etag_strong_and_content_based():
+    """Test ETags are quoted, strong and depend only on the body."""
+    etag = StoredDocument.create(b"{}", 1).etag
+    assert etag.startswith('"') and etag.endswith('"')
+    assert StoredDocument.create(b"{}", 2).etag == etag
+    assert StoredDocument.create(b"[]", 1).etag != etag
+
+
+def test_conditional_validators():
+    """Test If-None-Match and If-Modified-Since matching."""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+
+    assert not_modified_since("Tue, 14 Nov 2023 22:13:20 GMT", 1700000000)
+    assert not not_modified_since("Tue, 14 Nov 2023 22:13:19 GMT", 1700000000)
+    assert not not_modified_since("not a date", 1700000000)
+
+
+def test_document_error():
+    """Test the minimal DID Document structure check."""
+    assert document_error({"id": "did:web:example.com:alice"}) is None
+    assert document_error([]) == "Document must be an object"
+    assert document_error({"id": 1}) == "Document must have a string id"
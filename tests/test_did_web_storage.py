@@ -0,0 +1,67 @@
+"""Test did:web server storage backends."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from did_web_server.storage import (
+    MemoryDocumentStore,
+    SQLiteDocumentStore,
+    StoredDocument,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryDocumentStore()
+    else:
+        store = SQLiteDocumentStore(str(tmp_path / "documents.db"))
+        yield store
+        store.close()
+
+
+def test_put_get(store):
+    """Test documents are stored as given and replaced on put."""
+    alice = StoredDocument.create(b'{"id":"did:web:example.com:alice"}', 1700000000)
+    assert store.get("alice") is None
+    store.put("alice", alice)
+    assert store.get("alice") == alice
+
+    replaced = StoredDocument.create(b'{"id":"replaced"}')
+    store.put_many([("bob", StoredDocument.create(b"{}")), ("alice", replaced)])
+    assert store.get("alice") == replaced
+    assert store.get("bob").body == b"{}"
+
+
+def test_sqlite_persists(tmp_path):
+    """Test documents survive reopening the database and it is in WAL mode."""
+    path = str(tmp_path / "documents.db")
+    document = StoredDocument.create(b"{}")
+    store = SQLiteDocumentStore(path)
+    store.put("alice", document)
+    assert store.conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    store.close()
+
+    store = SQLiteDocumentStore(path)
+    assert store.get("alice") == document
+    store.close()
+
+
+def test_sqlite_connection_per_thread(tmp_path):
+    """Test each thread uses its own connection and close closes them all."""
+    store = SQLiteDocumentStore(str(tmp_path / "documents.db"))
+    document = StoredDocument.create(b"{}")
+    store.put("alice", document)
+
+    def _get(_):
+        return store.conn, store.get("alice")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(_get, range(2)))
+
+    assert all(found == document for _, found in results)
+    assert all(conn is not store.conn for conn, _ in results)
+    store.close()
+    assert store._connections == []
+
@@ -0,0 +1,160 @@
+"""Test endorsement of author signed ledger writes."""
+
+import asyncio
+import re
+
+from acapy_agent.connections.models.conn_record import ConnRecord
+from acapy_agent.core.event_bus import EventBus
+from acapy_agent.messaging.responder import BaseResponder
+from acapy_agent.protocols.endorse_transaction.v1_0.messages.transaction_acknowledgement import (
+    TransactionAcknowledgement,
+)
+from acapy_agent.protocols.endorse_transaction.v1_0.messages.transaction_request import (
+    TransactionRequest,
+)
+from acapy_agent.protocols.endorse_transaction.v1_0.models.transaction_record import (
+    TransactionRecord,
+)
+from acapy_agent.wallet.base import BaseWallet
+import pytest
+
+from acapy_did_indy.endorsement import EndorsementError, endorser_connection_for
+
+from .test_registrar import FakeLedger, create_nyms, ledger_profile, registrar
+
+ENDORSER_DID = "V4SGRU86Z58d6TV7PBUe6f"
+
+
+class FakeEndorser(BaseResponder):
+    """Responder endorsing every transaction request it is sent."""
+
+    def __init__(self, profile):
+        super().__init__()
+        self.profile = profile
+        self.requests = []
+        self.acks = []
+        self.tasks = []
+
+    async def send_outbound(self, message, **kwargs):
+        pass
+
+    async def send_webhook(self, topic: str, payload: dict):
+        pass
+
+    async def send(self, message, **kwargs):
+        if isinstance(message, TransactionRequest):
+            self.requests.append(message)
+            self.tasks.append(asyncio.create_task(self._endorse(message)))
+        elif isinstance(message, TransactionAcknowledgement):
+            self.acks.append(message)
+
+    async def _endorse(self, request: TransactionRequest):
+        async with self.profile.session() as session:
+            record = await TransactionRecord.retrieve_by_id(
+                session, request.transaction_id
+            )
+            record.state = TransactionRecord.STATE_TRANSACTION_ENDORSED
+            await record.save(session)
+
+
+async def author_profile(ledger: FakeLedger, **settings):
+    """Return an author profile with an endorser connection."""
+    profile = await ledger_profile(
+        ledger,
+        {"endorser.author": True, "endorser.endorser_alias": "endorser", **settings},
+    )
+    profile.context.injector.bind_instance(EventBus, EventBus())
+    endorser = FakeEndorser(profile)
+    profile.context.injector.bind_instance(BaseResponder, endorser)
+    async with profile.session() as session:
+        connection = ConnRecord(alias="endorser", state=ConnRecord.State.COMPLETED)
+        await connection.save(session)
+        await connection.metadata_set(
+            session, "endorser_info", {"endorser_did": ENDORSER_DID}
+        )
+        await connection.metadata_set(
+            session, "transaction_jobs", {"transaction_my_job": "TRANSACTION_AUTHOR"}
+        )
+    return profile, endorser
+
+
+def test_settings_defaults():
+    """Test unset endorsement settings fall back to their defaults."""
+    tracker = registrar("both").endorsements
+    assert (tracker.timeout, tracker.concurrency) == (300, 10)
+
+
+def test_publish_endorsed():
+    """Test author signed writes are endorsed, then written as signed."""
+    ledger = FakeLedger()
+    indy = registrar("both", ledger_write_max_attempts=0)
+
+    async def run():
+        profile, endorser = await author_profile(ledger)
+        indy.endorsements.subscribe(profile.inject(EventBus))
+        nyms = await create_nyms(profile, 2)
+        results = await indy.from_public_nyms(profile, nyms, didcomm=False)
+        await asyncio.gather(*endorser.tasks)
+        return nyms, results, endorser
+
+    nyms, results, endorser = asyncio.run(run())
+    for nym in nyms:
+        assert results[nym].did == f"did:indy:indicio:test:{nym}"
+    assert len(endorser.requests) == 4
+    assert sorted(ledger.submitted) == ["1", "1", "100", "100"]
+    for body in ledger.written:
+        assert body["endorser"] == ENDORSER_DID
+        assert body["identifier"] in nyms
+
+
+def test_publish_endorsed_skips_post_processing():
+    """Test endorsed writes are acked without promoting nyms to public DID."""
+    ledger = FakeLedger()
+    indy = registrar("both", ledger_write_max_attempts=0)
+    endorse_did_events = []
+
+    async def on_endorse_did(profile, event):
+        endorse_did_events.append(event)
+
+    async def run():
+        profile, endorser = await author_profile(
+            ledger, **{"endorser.auto_promote_author_did": True}
+        )
+        event_bus = profile.inject(EventBus)
+        indy.endorsements.subscribe(event_bus)
+        event_bus.subscribe(re.compile("^acapy::ENDORSE_DID"), on_endorse_did)
+        nyms = await create_nyms(profile, 2)
+        await indy.from_public_nyms(profile, nyms, didcomm=False)
+        await asyncio.gather(*endorser.tasks)
+        async with profile.session() as session:
+            public_did = await session.inject(BaseWallet).get_public_did()
+            records = await TransactionRecord.query(session)
+        return public_did, records, endorser
+
+    public_did, records, endorser = asyncio.run(run())
+    assert public_did is None
+    assert endorse_did_events == []
+    assert {record.state for record in records} == {
+        TransactionRecord.STATE_TRANSACTION_ACKED
+    }
+    assert sorted(ack.thread_id for ack in endorser.acks) == sorted(
+        record.transaction_id for record in records
+    )
+
+
+def test_auto_write_with_auto_promote_refused():
+    """Test authors writing and promoting endorsed nyms themselves are refused."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile, _ = await author_profile(
+            ledger,
+            **{
+                "endorser.auto_write": True,
+                "endorser.auto_promote_author_did": True,
+            },
+        )
+        with pytest.raises(EndorsementError, match="auto promote"):
+            await endorser_connection_for(profile)
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+"""Test genesis cache."""
+
+from acapy_agent.config.settings import Settings
+
+from acapy_did_indy.genesis import GenesisCache, fingerprint
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_store_load(tmp_path):
+    """Test stored genesis round trips."""
+    cache = GenesisCache(tmp_path)
+    assert cache.load("https://example.com/genesis") is None
+    stored = cache.store("https://example.com/genesis", '{"txn": 1}\n')
+    loaded = cache.load("https://example.com/genesis")
+    assert loaded == stored
+    assert loaded.fingerprint == fingerprint('{"txn": 1}\n')
+
+
+def test_corrupt_entry_ignored(tmp_path):
+    """Test entries not matching their fingerprint are ignored."""
+    cache = GenesisCache(tmp_path)
+    cache.store("https://example.com/genesis", '{"txn": 1}\n')
+    path = cache.path_for("https://example.com/genesis")
+    path.write_text(path.read_text().replace("txn", "nxt"))
+    assert cache.load("https://example.com/genesis") is None
+
+    path.write_text("not json")
+    assert cache.load("https://example.com/genesis") is None
+
+
+def test_stale(tmp_path):
+    """Test entries older than max age are stale."""
+    clock = FakeClock()
+    cache = GenesisCache(tmp_path, max_age=60, clock=clock)
+    entry = cache.store("https://example.com/genesis", '{"txn": 1}\n')
+    assert not cache.is_stale(entry)
+    clock.now += 61
+    assert cache.is_stale(entry)
+
+
+def test_from_settings(tmp_path):
+    """Test a configured directory enables the cache with the default max age."""
+    assert GenesisCache.from_settings(Settings({})) is None
+    cache = GenesisCache.from_settings(Settings({"genesis_cache_dir": str(tmp_path)}))
+    assert cache
+    assert cache.max_age == 86400
+    entry = cache.store("https://example.com/genesis", '{"txn": 1}\n')
+    assert not cache.is_stale(entry)
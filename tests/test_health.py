@@ -0,0 +1,68 @@
+"""Test pool health monitoring."""
+
+import asyncio
+
+from acapy_agent.config.settings import Settings
+
+from acapy_did_indy.health import DEGRADED, HEALTHY, PoolHealthMonitor
+from acapy_did_indy.pools import LedgerPools
+
+
+class FakePool:
+    """Stand-in for indy_vdr.Pool."""
+
+    def __init__(self):
+        self.fail = False
+        self.refreshes = 0
+
+    async def refresh(self):
+        self.refreshes += 1
+        if self.fail:
+            raise ConnectionError("pool unreachable")
+
+    async def submit_request(self, request):
+        return {}
+
+
+def test_degraded_and_recovered():
+    """Test pools are degraded after repeated failures and recover on success."""
+    pool = FakePool()
+    pools = LedgerPools({"indicio:test": "https://example.com/genesis"})
+    pools.pools["indicio:test"] = pool
+    monitor = PoolHealthMonitor(pools, degraded_after=2)
+
+    health = asyncio.run(monitor.check("indicio:test"))
+    assert health.status == HEALTHY
+    assert health.last_rtt is not None
+
+    pool.fail = True
+    asyncio.run(monitor.check("indicio:test"))
+    assert health.status == HEALTHY
+    asyncio.run(monitor.check("indicio:test"))
+    assert health.status == DEGRADED
+    assert health.last_error == "pool unreachable"
+
+    pool.fail = False
+    asyncio.run(monitor.check_all())
+    assert monitor.report()["indicio:test"]["status"] == HEALTHY
+    assert pool.refreshes == 4
+
+
+def test_from_settings():
+    """Test unset settings use their defaults and an interval of 0 disables checks."""
+    pools = LedgerPools({"indicio:test": "https://example.com/genesis"})
+    monitor = PoolHealthMonitor.from_settings(Settings({}), pools)
+    assert (monitor.interval, monitor.degraded_after, monitor.timeout) == (600, 3, 30)
+
+    async def run():
+        monitor.start()
+        assert monitor.running
+        await monitor.stop()
+
+        disabled = PoolHealthMonitor.from_settings(
+            Settings({"pool_refresh_interval": 0}), pools
+        )
+        disabled.start()
+        assert not disabled.running
+
+    asyncio.run(run())
@@ -1,8 +1,75 @@
 """Test Indy Resolver."""
 
+import asyncio
+from unittest import mock
+
+from acapy_agent.config.injection_context import InjectionContext
+from acapy_agent.resolver.base import DIDNotFound, ResolverError
+from indy_vdr import VdrError, VdrErrorCode
 import pytest
 
-from acapy_did_indy.resolver import INDY_DID_PATTERN
+from acapy_did_indy.cache import ResolutionCache
+from acapy_did_indy.genesis import GenesisCache
+from acapy_did_indy.pools import LedgerPools
+from acapy_did_indy.resolver import INDY_DID_PATTERN, IndyResolver
+
+LEDGERS = {
+    "indicio:test": "https://example.com/test/genesis",
+    "indicio:demo": "https://example.com/demo/genesis",
+}
+
+
+class FakePool(str):
+    """Stand-in for indy_vdr.Pool recording whether it was closed."""
+
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class PoolOpener:
+    """Stand-in for indy_vdr.open_pool counting the pools opened."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.opened = []
+
+    async def __call__(self, transactions: str):
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise VdrError(VdrErrorCode.CONNECTION, "Could not connect to pool")
+        self.opened.append(transactions)
+        return FakePool(f"pool for {transactions}")
+
+    def patch(self):
+        """Patch pools to open with this opener and genesis from the url."""
+
+        async def _fetch(url: str) -> str:
+            return url
+
+        return mock.patch.multiple(
+            "acapy_did_indy.pools",
+            open_pool=self,
+            fetch_genesis_transactions=_fetch,
+        )
+
+
+async def lazy_resolver(opener: PoolOpener, known: set) -> IndyResolver:
+    """Return a resolver set up to open pools on first use with opener."""
+    resolver = IndyResolver()
+    context = InjectionContext(
+        settings={
+            "plugin_config": {
+                "acapy_did_indy": {"ledgers": LEDGERS, "lazy_pools": True}
+            }
+        }
+    )
+    with opener.patch():
+        await resolver.setup(context)
+    assert opener.opened == []
+    resolver._resolver = FakeVdrResolver(known)
+    return resolver
 
 
 @pytest.mark.parametrize(("did", "namespace"), [
@@ -29,3 +96,237 @@ def test_pattern_x(did: str):
     """Test negative cases."""
     match = INDY_DID_PATTERN.fullmatch(did)
     assert not match
+
+
+class FakeVdrResolver:
+    """Stand-in for indy_vdr.Resolver counting lookups."""
+
+    def __init__(self, known: set):
+        self.known = known
+        self.lookups = 0
+        self.ledgers = {}
+
+    def add_ledger(self, namespace: str, pool):
+        self.ledgers[namespace] = pool
+
+    async def resolve(self, did: str) -> dict:
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        if did not in self.known:
+            raise VdrError(VdrErrorCode.RESOLVER, "Object not found")
+        return {"didDocument": {"id": did}}
+
+
+def test_resolve_cached_and_coalesced():
+    """Test concurrent resolutions share one lookup and later ones hit the cache."""
+    did = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver({did})
+
+    async def run():
+        await asyncio.gather(*(resolver._resolve(None, did) for _ in range(5)))
+        return await resolver._resolve(None, did)
+
+    assert asyncio.run(run()) == {"id": did}
+    assert resolver._resolver.lookups == 1
+    assert resolver.in_flight.coalesced == 4
+    assert resolver.cache.hits == 1
+
+
+def test_resolve_many():
+    """Test resolving many DIDs returns a result or error per DID."""
+    found = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    missing = "did:indy:sovrin:As728S9715ppSToDurKnvT"
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver({found})
+
+    results = asyncio.run(
+        resolver.resolve_many(None, [found, missing, "did:example:123", found])
+    )
+    assert list(results) == [found, missing, "did:example:123"]
+    assert results[found] == {"id": found}
+    assert isinstance(results[missing], DIDNotFound)
+    assert isinstance(results["did:example:123"], ResolverError)
+
+
+def test_resolve_many_unexpected_error():
+    """Test an unexpected error resolving one DID does not fail the batch."""
+    found = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    broken = "did:indy:indicio:test:WgWxqztrNooG92RXvxSTWv"
+
+    class BrokenVdrResolver(FakeVdrResolver):
+        async def resolve(self, did: str) -> dict:
+            if did == broken:
+                raise TimeoutError()
+            return await super().resolve(did)
+
+    resolver = IndyResolver()
+    resolver._resolver = BrokenVdrResolver({found})
+
+    results = asyncio.run(resolver.resolve_many(None, [found, broken]))
+    assert results[found] == {"id": found}
+    assert isinstance(results[broken], TimeoutError)
+
+
+def test_setup_defaults():
+    """Test a resolver set up without tuning settings resolves with defaults."""
+    found = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    resolver = IndyResolver()
+    context = InjectionContext(
+        settings={"plugin_config": {"acapy_did_indy": {"auto_ledger": True}}}
+    )
+
+    async def run():
+        await resolver.setup(context)
+        resolver._resolver = FakeVdrResolver({found})
+        return await resolver.resolve_many(None, [found])
+
+    assert asyncio.run(run()) == {found: {"id": found}}
+    assert resolver.batch_concurrency == 10
+
+
+def test_unknown_namespace_rejected():
+    """Test DIDs in unconfigured namespaces are rejected without a lookup."""
+    did = "did:indy:sovrin:As728S9715ppSToDurKnvT"
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver({did})
+    resolver.namespaces = frozenset({"indicio:test"})
+
+    assert not asyncio.run(resolver.supports(None, did))
+    assert not asyncio.run(resolver.supports(None, "did:example:123"))
+    assert asyncio.run(
+        resolver.supports(None, "did:indy:indicio:test:As728S9715ppSToDurKnvT")
+    )
+    with pytest.raises(DIDNotFound):
+        asyncio.run(resolver._resolve(None, did))
+    assert resolver._resolver.lookups == 0
+
+
+def test_stale_while_revalidate():
+    """Test stale documents are served while refreshed in the background."""
+    did = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver({did})
+    resolver.cache = ResolutionCache(ttl=-1, max_stale=60)
+
+    async def run():
+        await resolver._resolve(None, did)
+        assert resolver._resolver.lookups == 1
+        assert await resolver._resolve(None, did) == {"id": did}
+        assert resolver.cache.stale_hits == 1
+        await asyncio.gather(*resolver._revalidations)
+
+    asyncio.run(run())
+    assert resolver._resolver.lookups == 2
+
+
+def test_resolve_metrics():
+    """Test ledger outcomes are counted per namespace."""
+    found = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    missing = "did:indy:indicio:test:As728S9715ppSToDurKnvU"
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver({found})
+    asyncio.run(resolver.resolve_many(None, [found, missing]))
+
+    lines = resolver.metrics.render().splitlines()
+    assert 'acapy_did_indy_resolve_total{namespace="indicio:test",outcome="found"} 1' in lines
+    assert (
+        'acapy_did_indy_resolve_total{namespace="indicio:test",outcome="not_found"} 1'
+        in lines
+    )
+    assert 'acapy_did_indy_resolve_in_flight{namespace="indicio:test"} 0' in lines
+    assert 'acapy_did_indy_cache_requests_total{result="miss"} 2' in lines
+
+
+def test_open_all_concurrent():
+    """Test concurrent opens open each configured pool once."""
+    opener = PoolOpener()
+    pools = LedgerPools(LEDGERS)
+
+    async def run():
+        with opener.patch():
+            return await asyncio.gather(
+                pools.open_all(), pools.open_all(), pools.open("indicio:test")
+            )
+
+    opened, _, pool = asyncio.run(run())
+    assert sorted(opener.opened) == sorted(LEDGERS.values())
+    assert opened == {
+        namespace: f"pool for {url}" for namespace, url in LEDGERS.items()
+    }
+    assert pool == opened["indicio:test"]
+
+
+def test_changed_genesis_reopens_pool(tmp_path):
+    """Test a pool opened from cached genesis is reopened from changed genesis."""
+    url = LEDGERS["indicio:test"]
+    cache = GenesisCache(tmp_path)
+    cache.store(url, "old genesis")
+    opener = PoolOpener()
+    pools = LedgerPools(LEDGERS, cache)
+    resolver = IndyResolver()
+    resolver._resolver = FakeVdrResolver(set())
+    pools.on_reopen = resolver._replace_pool
+
+    async def _fetch(url: str) -> str:
+        return "new genesis"
+
+    async def run():
+        with opener.patch(), mock.patch(
+            "acapy_did_indy.genesis.fetch_genesis_transactions", _fetch
+        ):
+            pool = await pools.open("indicio:test")
+            await asyncio.gather(*pools._tasks)
+        return pool
+
+    old = asyncio.run(run())
+    assert old == "pool for old genesis"
+    assert old.closed
+    assert opener.opened == ["old genesis", "new genesis"]
+    assert pools.pools["indicio:test"] == "pool for new genesis"
+    assert not pools.pools["indicio:test"].closed
+    assert resolver.resolver.ledgers == {"indicio:test": "pool for new genesis"}
+    assert cache.load(url).transactions == "new genesis"
+
+
+def test_lazy_pools_opened_on_first_lookup():
+    """Test lazy pools are opened once by concurrent first lookups and registered."""
+    dids = [
+        "did:indy:indicio:test:As728S9715ppSToDurKnvT",
+        "did:indy:indicio:test:As728S9715ppSToDurKnvU",
+    ]
+    opener = PoolOpener()
+
+    async def run():
+        resolver = await lazy_resolver(opener, set(dids))
+        with opener.patch():
+            results = await asyncio.gather(
+                *(resolver._resolve(None, did) for did in dids)
+            )
+        return resolver, results
+
+    resolver, results = asyncio.run(run())
+    assert results == [{"id": did} for did in dids]
+    assert opener.opened == [LEDGERS["indicio:test"]]
+    assert resolver.resolver.ledgers == {
+        "indicio:test": f"pool for {LEDGERS['indicio:test']}"
+    }
+    assert list(resolver.pools.pools) == ["indicio:test"]
+
+
+def test_lazy_pool_open_failure():
+    """Test a pool failing to open is reported as a resolver error."""
+    did = "did:indy:indicio:test:As728S9715ppSToDurKnvT"
+    opener = PoolOpener(fail=True)
+
+    async def run():
+        resolver = await lazy_resolver(opener, {did})
+        with opener.patch():
+            with pytest.raises(ResolverError, match="indicio:test"):
+                await resolver._resolve(None, did)
+        return resolver
+
+    resolver = asyncio.run(run())
+    assert resolver.resolver.ledgers == {}
+    assert resolver.resolver.lookups == 0
+    assert resolver.pools.pools == {}
@@ -0,0 +1,115 @@
+"""Test background registration jobs."""
+
+import asyncio
+import re
+
+from acapy_agent.core.event_bus import EventBus
+
+from acapy_did_indy.jobs import RegistrationJobRecord, RegistrationJobs
+
+from .test_registrar import FakeLedger, create_nyms, ledger_profile, registrar
+from .test_routes import bind_route_manager
+
+
+async def jobs_profile(ledger: FakeLedger, **config):
+    """Return a profile, its registration jobs and the job states emitted."""
+    profile = await ledger_profile(ledger)
+    bind_route_manager(profile)
+    event_bus = EventBus()
+    profile.context.injector.bind_instance(EventBus, event_bus)
+    states = []
+
+    async def _on_event(profile, event):
+        states.append(event.payload["state"])
+
+    event_bus.subscribe(
+        re.compile(f"^acapy::record::{RegistrationJobRecord.RECORD_TOPIC}::.*$"),
+        _on_event,
+    )
+    jobs = RegistrationJobs(
+        registrar("nym", **{"ledger_write_max_attempts": 0, **config})
+    )
+    return profile, jobs, states
+
+
+async def finished(profile, jobs: RegistrationJobs, job_id: str):
+    """Wait for running jobs and return the stored job."""
+    await asyncio.gather(*jobs._tasks)
+    async with profile.session() as session:
+        return await RegistrationJobRecord.retrieve_by_id(session, job_id)
+
+
+def test_submit_completed():
+    """Test a submitted job completes with the created DID."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile, jobs, states = await jobs_profile(ledger)
+        (nym,) = await create_nyms(profile, 1)
+        job = await jobs.submit(profile, nym, didcomm=False)
+        assert job.state == RegistrationJobRecord.STATE_PENDING
+        return nym, await finished(profile, jobs, job.job_id), states
+
+    nym, job, states = asyncio.run(run())
+    assert job.state == RegistrationJobRecord.STATE_COMPLETED
+    assert job.did == f"did:indy:indicio:test:{nym}"
+    assert job.error is None
+    assert states == ["pending", "completed"]
+    assert ledger.submitted == ["1"]
+
+
+def test_submit_failed():
+    """Test a job fails with the reason when registration raises."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile, jobs, states = await jobs_profile(ledger)
+        job = await jobs.submit(profile, "unknown", didcomm=False)
+        return await finished(profile, jobs, job.job_id), states
+
+    job, states = asyncio.run(run())
+    assert job.state == RegistrationJobRecord.STATE_FAILED
+    assert job.did is None
+    assert "unknown" in job.error
+    assert states == ["pending", "failed"]
+    assert ledger.submitted == []
+
+
+def test_submit_queued_write():
+    """Test a job whose ledger write is queued for retry reports the write."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile, jobs, _ = await jobs_profile(ledger, ledger_write_max_attempts=10)
+        (nym,) = await create_nyms(profile, 1)
+        ledger.unavailable = {nym}
+        job = await jobs.submit(profile, nym, didcomm=False)
+        return await finished(profile, jobs, job.job_id)
+
+    job = asyncio.run(run())
+    assert job.state == RegistrationJobRecord.STATE_COMPLETED
+    assert job.write_id
+
+
+def test_resume():
+    """Test jobs left pending, such as by a restart, are resumed."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile, jobs, _ = await jobs_profile(ledger)
+        (nym,) = await create_nyms(profile, 1)
+        pending = RegistrationJobRecord(nym=nym, didcomm=False)
+        done = RegistrationJobRecord(
+            nym=nym, didcomm=False, state=RegistrationJobRecord.STATE_FAILED
+        )
+        async with profile.session() as session:
+            await pending.save(session)
+            await done.save(session)
+
+        assert await jobs.resume(profile) == 1
+        return nym, await finished(profile, jobs, pending.job_id)
+
+    nym, job = asyncio.run(run())
+    assert job.state == RegistrationJobRecord.STATE_COMPLETED
+    assert job.did == f"did:indy:indicio:test:{nym}"
+    assert ledger.submitted == ["1"]
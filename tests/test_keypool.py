@@ -0,0 +1,127 @@
+"""Test LDP-VC key pool."""
+
+import asyncio
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.storage.base import BaseStorage
+from acapy_agent.utils.testing import create_test_profile
+from acapy_agent.wallet.base import BaseWallet
+from acapy_agent.wallet.key_type import KeyTypes
+
+from acapy_did_indy.keypool import POOLED_KEY_RECORD_TYPE, KeyPool
+
+
+async def key_profile():
+    """Return a test profile able to create keys."""
+    profile = await create_test_profile()
+    profile.context.injector.bind_instance(KeyTypes, KeyTypes())
+    return profile
+
+
+async def claim(pool: KeyPool, profile, kid: str):
+    """Claim a key for kid and return it with the key the wallet has for kid."""
+    async with profile.session() as session:
+        key = await pool.claim(profile, session, kid)
+        info = await session.inject(BaseWallet).get_key_by_kid(kid)
+    return key, info
+
+
+async def refilled(pool: KeyPool, profile):
+    """Wait for pool's refills and return the verkeys noted in storage."""
+    await asyncio.gather(*pool._refills.values())
+    async with profile.session() as session:
+        records = await session.inject(BaseStorage).find_all_records(
+            POOLED_KEY_RECORD_TYPE
+        )
+    return {record.value for record in records}
+
+
+def test_claim_uses_pooled_keys_and_refills():
+    """Test claims take pre-generated keys and top the pool up."""
+
+    async def _test():
+        profile = await key_profile()
+        pool = KeyPool(size=4)
+
+        key, info = await claim(pool, profile, "did:indy:test:a#assert")
+        assert pool.missed == 1
+        assert info.verkey == key.verkey
+
+        stored = await refilled(pool, profile)
+        assert pool.available(profile) == 4
+        assert len(stored) == 4
+
+        key, info = await claim(pool, profile, "did:indy:test:b#assert")
+        assert pool.claimed == 1
+        assert info.verkey == key.verkey
+        assert key.verkey in stored
+        assert pool.available(profile) == 3
+        assert await refilled(pool, profile) == stored - {key.verkey}
+
+    asyncio.run(_test())
+
+
+def test_unclaimed_keys_reloaded():
+    """Test keys left in the pool by a previous run are loaded, not recreated."""
+
+    async def _test():
+        profile = await key_profile()
+        first = KeyPool(size=3)
+        first.refill(profile)
+        stored = await refilled(first, profile)
+
+        second = KeyPool(size=3)
+        second.refill(profile)
+        assert await refilled(second, profile) == stored
+        assert second.available(profile) == 3
+
+        disabled = KeyPool()
+        disabled.refill(profile)
+        await refilled(disabled, profile)
+        assert disabled.available(profile) == 3
+
+        # A key claimed through one pool is skipped by the others
+        key, _ = await claim(first, profile, "did:indy:test:a#assert")
+        await refilled(first, profile)
+        key, info = await claim(second, profile, "did:indy:test:b#assert")
+        assert info.verkey == key.verkey
+        assert second.claimed == 1
+        assert second.missed == 0
+
+    asyncio.run(_test())
+
+
+def test_disabled_pool_creates_keys_inline():
+    """Test a pool of size 0 never pre-generates keys."""
+
+    async def _test():
+        profile = await key_profile()
+        pool = KeyPool()
+
+        key, info = await claim(pool, profile, "did:indy:test:a#assert")
+        assert info.verkey == key.verkey
+        assert not await refilled(pool, profile)
+        assert pool.available(profile) == 0
+        assert pool.missed == 0
+
+    asyncio.run(_test())
+
+
+def test_from_settings():
+    """Test the pool is disabled when its size is unset."""
+
+    async def _test():
+        profile = await key_profile()
+        pool = KeyPool.from_settings(Settings({}))
+        assert not pool.enabled
+
+        pool.refill(profile)
+        assert not await refilled(pool, profile)
+        assert pool.available(profile) == 0
+
+        sized = KeyPool.from_settings(Settings({"ldp_vc_key_pool_size": "2"}))
+        sized.refill(profile)
+        assert len(await refilled(sized, profile)) == 2
+        assert sized.available(profile) == 2
+
+    asyncio.run(_test())
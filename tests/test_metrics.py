@@ -0,0 +1,35 @@
+"""Test metrics rendering."""
+
+from acapy_did_indy.metrics import MetricsRegistry
+
+
+def test_render():
+    """Test counters, gauges and histograms render in Prometheus text format."""
+    registry = MetricsRegistry()
+    counter = registry.counter("resolves_total", "Resolves", ["outcome"])
+    gauge = registry.gauge("in_flight", "In flight")
+    histogram = registry.histogram("latency_seconds", "Latency", ["ns"], [0.1, 1])
+
+    counter.inc("found")
+    counter.inc("found")
+    gauge.inc()
+    histogram.observe("a", value=0.05)
+    histogram.observe("a", value=0.5)
+    histogram.observe("a", value=5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE resolves_total counter" in lines
+    assert 'resolves_total{outcome="found"} 2' in lines
+    assert "in_flight 1" in lines
+    assert 'latency_seconds_bucket{ns="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{ns="a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{ns="a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{ns="a"} 3' in lines
+
+
+def test_collectors():
+    """Test collectors run before rendering."""
+    registry = MetricsRegistry()
+    gauge = registry.gauge("entries", "Entries")
+    registry.on_collect(lambda: gauge.set(value=42))
+    assert "entries 42" in registry.render().splitlines()
@@ -0,0 +1,61 @@
+"""Test ledger write outbox."""
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.ledger.error import ClosedPoolError, LedgerTransactionError
+from indy_vdr import VdrError, VdrErrorCode
+
+from acapy_did_indy.outbox import LedgerWriteOutbox, backoff_delay, is_transient
+
+
+async def publish(profile, record):
+    pass
+
+
+def test_backoff_delay_doubles_up_to_maximum():
+    """Test delays double per attempt and are capped."""
+    assert [backoff_delay(n, 2, 30, lambda: 1.0) for n in range(1, 6)] == [
+        2,
+        4,
+        8,
+        16,
+        30,
+    ]
+
+
+def test_backoff_delay_jitter():
+    """Test jitter randomizes the upper half of the delay."""
+    assert backoff_delay(3, 2, 300, lambda: 0.0) == 4
+    assert backoff_delay(3, 2, 300, lambda: 0.5) == 6
+
+
+def test_from_settings():
+    """Test unset settings fall back to defaults and zero may be configured."""
+    defaults = LedgerWriteOutbox.from_settings(Settings({}), publish)
+    assert (defaults.max_attempts, defaults.retry_delay) == (10, 2)
+    assert defaults.max_retry_delay == 300
+
+    zero = LedgerWriteOutbox.from_settings(
+        Settings({"ledger_write_max_attempts": 0, "ledger_write_retry_delay": 0}),
+        publish,
+    )
+    assert (zero.max_attempts, zero.retry_delay) == (0, 0)
+    assert not zero.enabled
+
+
+def test_is_transient():
+    """Test only pool connection failures and timeouts are retried."""
+
+    def wrapped(code: VdrErrorCode) -> LedgerTransactionError:
+        try:
+            raise LedgerTransactionError("Ledger request error") from VdrError(
+                code, "error"
+            )
+        except LedgerTransactionError as error:
+            return error
+
+    assert is_transient(wrapped(VdrErrorCode.POOL_TIMEOUT))
+    assert is_transient(wrapped(VdrErrorCode.CONNECTION))
+    assert is_transient(ClosedPoolError("Pool is closed"))
+    assert not is_transient(wrapped(VdrErrorCode.POOL_REQUEST_FAILED))
+    assert not is_transient(LedgerTransactionError("Ledger rejected transaction"))
+    assert not is_transient(ValueError())
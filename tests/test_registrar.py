@@ -0,0 +1,606 @@
+"""Test Indy Registrar."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Optional
+from unittest import mock
+
+from acapy_agent.config.settings import Settings
+from acapy_agent.core.event_bus import Event
+from acapy_agent.core.profile import Profile
+from acapy_agent.ledger.base import BaseLedger
+from acapy_agent.ledger.error import LedgerTransactionError
+from acapy_agent.utils.testing import create_test_profile
+from acapy_agent.wallet.base import BaseWallet
+from acapy_agent.wallet.did_info import DIDInfo
+from acapy_agent.wallet.did_method import SOV, DIDMethods
+from acapy_agent.wallet.error import WalletNotFoundError
+from acapy_agent.wallet.key_type import ED25519, KeyTypes
+from indy_vdr import VdrError, VdrErrorCode
+import pytest
+
+from acapy_did_indy.did import INDY
+from acapy_did_indy.registrar import (
+    MEDIATION_EVENT_PATTERN,
+    IndyRegistrar,
+    IndyRegistrarError,
+    PreparedRegistration,
+    rejects_nym_diddoc,
+    write_mode_for,
+)
+from acapy_did_indy.outbox import LedgerWriteRecord
+
+NYM = DIDInfo(
+    did="As728S9715ppSToDurKnvT",
+    verkey="6QSduYdf8Bi6t8PfNm5vNomGWDtXhmMmTRzaciudBXYJ",
+    metadata={},
+    method=INDY,
+    key_type=ED25519,
+)
+
+
+def ledger_error(
+    code: VdrErrorCode, message: str, extra: Optional[str] = None
+) -> LedgerTransactionError:
+    """Return the error ACA-Py raises for a ledger write failing with code."""
+    try:
+        raise LedgerTransactionError("Ledger request error") from VdrError(
+            code, message, extra
+        )
+    except LedgerTransactionError as error:
+        return error
+
+
+def pool_timeout() -> LedgerTransactionError:
+    """Return the error raised by a ledger write timing out."""
+    return ledger_error(VdrErrorCode.POOL_TIMEOUT, "Request timed out")
+
+
+def rejected(reason: str) -> LedgerTransactionError:
+    """Return the error raised by the ledger nacking a write for reason."""
+    return ledger_error(
+        VdrErrorCode.POOL_REQUEST_FAILED,
+        "Request failed: client request invalid",
+        json.dumps({"op": "REQNACK", "reason": reason}),
+    )
+
+
+class FakeLedger:
+    """Stand-in for BaseLedger recording submitted transaction types.
+
+    diddocContent written on NYMs and ATTRIBs is kept and returned by reads.
+    Requests not written to the ledger are returned as the request JSON. Writes
+    signed by nyms in reject are rejected and those in unavailable time out.
+    """
+
+    def __init__(
+        self,
+        reject_nym_diddoc: bool = False,
+        reject: set = frozenset(),
+        unavailable: set = frozenset(),
+    ):
+        self.reject_nym_diddoc = reject_nym_diddoc
+        self.reject = reject
+        self.unavailable = unavailable
+        self.submitted = []
+        self.written = []
+        self.nyms = {}
+        self.attribs = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _read(self, operation: dict) -> str:
+        if operation["type"] == "105":
+            content = self.nyms.get(operation["dest"])
+            data = json.dumps({"diddocContent": content}) if content else None
+        else:
+            data = self.attribs.get(operation["dest"])
+        return json.dumps({"op": "REPLY", "result": {"data": data}})
+
+    async def txn_submit(
+        self, txn, sign, sign_did=None, write_ledger=True, taa_accept=None
+    ):
+        body = json.loads(txn if isinstance(txn, str) else txn.body)
+        operation = body["operation"]
+        txn_type = operation["type"]
+        if txn_type in ("104", "105"):
+            return self._read(operation)
+        if not write_ledger:
+            return json.dumps(body)
+        if txn_type == "1" and self.reject_nym_diddoc:
+            raise rejected(
+                "client request invalid: InvalidClientRequest("
+                "'validation error [ClientNymOperation]: "
+                "unknown field (diddocContent={})')"
+            )
+        if body["identifier"] in self.reject:
+            raise rejected("client request invalid: UnauthorizedClientRequest()")
+        if body["identifier"] in self.unavailable:
+            raise pool_timeout()
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        self.submitted.append(txn_type)
+        if txn_type == "1":
+            self.nyms[operation["dest"]] = operation["diddocContent"]
+        else:
+            self.attribs[operation["dest"]] = operation["raw"]
+        self.written.append(body)
+        txn = {"type": txn_type, "data": {"dest": operation["dest"]}}
+        return json.dumps({"op": "REPLY", "result": {"txn": txn}})
+
+
+def registrar(write_mode: str | dict, **config) -> IndyRegistrar:
+    """Return a registrar using write_mode."""
+    return IndyRegistrar(
+        Settings(
+            {
+                "plugin_config": {
+                    "acapy_did_indy": {
+                        "indy_namespace": "indicio:test",
+                        "diddoc_content_write": write_mode,
+                        **config,
+                    }
+                }
+            }
+        )
+    )
+
+
+def prepared() -> PreparedRegistration:
+    """Return a registration ready to publish."""
+    return PreparedRegistration(NYM, NYM, {"service": []})
+
+
+async def ledger_profile(ledger: FakeLedger, settings: dict | None = None) -> Profile:
+    """Return a test profile writing to ledger."""
+    profile = await create_test_profile(settings)
+    did_methods = DIDMethods()
+    did_methods.register(INDY)
+    profile.context.injector.bind_instance(DIDMethods, did_methods)
+    profile.context.injector.bind_instance(KeyTypes, KeyTypes())
+    base_ledger = mock.MagicMock(BaseLedger, autospec=True)
+    base_ledger.txn_submit = ledger.txn_submit
+    profile.context.injector.bind_instance(BaseLedger, base_ledger)
+    return profile
+
+
+async def create_nyms(profile: Profile, count: int) -> list:
+    """Create count nyms in the profile's wallet."""
+    async with profile.session() as session:
+        wallet = session.inject(BaseWallet)
+        return [
+            (await wallet.create_local_did(SOV, ED25519)).did for _ in range(count)
+        ]
+
+
+def test_write_mode_for():
+    """Test write mode lookup per namespace."""
+    assert write_mode_for(None, "indicio:test") == "both"
+    assert write_mode_for("nym", "indicio:test") == "nym"
+    assert write_mode_for({"indicio:test": "attrib"}, "indicio:test") == "attrib"
+    assert write_mode_for({"indicio:test": "attrib"}, "sovrin") == "both"
+    with pytest.raises(IndyRegistrarError):
+        write_mode_for("nope", "indicio:test")
+
+
+@pytest.mark.parametrize(
+    ("write_mode", "expected"),
+    [("both", ["1", "100"]), ("nym", ["1"]), ("attrib", ["100"]), ("auto", ["1"])],
+)
+def test_publish_write_modes(write_mode: str, expected: list):
+    """Test each write mode submits the expected transactions."""
+    ledger = FakeLedger()
+    asyncio.run(registrar(write_mode)._publish(ledger, prepared()))
+    assert sorted(ledger.submitted) == expected
+
+
+def test_publish_auto_legacy_ledger():
+    """Test auto mode falls back to ATTRIB and remembers the ledger is legacy."""
+    ledger = FakeLedger(reject_nym_diddoc=True)
+    auto = registrar("auto")
+    asyncio.run(auto._publish(ledger, prepared()))
+    assert ledger.submitted == ["100"]
+    assert auto.nym_diddoc_support == {"indicio:test": False}
+
+    asyncio.run(auto._publish(ledger, prepared()))
+    assert ledger.submitted == ["100", "100"]
+
+
+def test_publish_auto_other_rejection():
+    """Test auto mode only falls back when the ledger rejects diddocContent."""
+    ledger = FakeLedger(reject={NYM.did})
+    auto = registrar("auto")
+    with pytest.raises(LedgerTransactionError):
+        asyncio.run(auto._publish(ledger, prepared()))
+    assert ledger.submitted == []
+    assert auto.nym_diddoc_support == {}
+
+
+def test_rejects_nym_diddoc():
+    """Test the diddocContent rejection is read from the VdrError cause."""
+    assert rejects_nym_diddoc(rejected("unknown field (diddocContent={})"))
+    assert not rejects_nym_diddoc(rejected("UnauthorizedClientRequest()"))
+    assert not rejects_nym_diddoc(pool_timeout())
+    assert not rejects_nym_diddoc(LedgerTransactionError("diddocContent"))
+
+
+def test_settings_defaults():
+    """Test unset batching settings fall back to their defaults."""
+    indy = registrar("both")
+    assert (indy.batch_size, indy.write_concurrency) == (100, 10)
+
+
+def test_from_public_nyms():
+    """Test bulk registration batches wallet work and bounds concurrent writes."""
+    ledger = FakeLedger()
+    indy = registrar(
+        "nym",
+        registration_batch_size=2,
+        registration_concurrency=2,
+        ledger_write_max_attempts=0,
+    )
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        nyms = await create_nyms(profile, 5)
+        first = await indy.from_public_nyms(
+            profile, [*nyms, "unknown", nyms[0]], didcomm=False
+        )
+        again = await indy.from_public_nyms(profile, nyms[:1], didcomm=False)
+        return nyms, first, again
+
+    nyms, first, again = asyncio.run(run())
+    assert list(first) == [*nyms, "unknown"]
+    for nym in nyms:
+        assert first[nym].did == f"did:indy:indicio:test:{nym}"
+    assert isinstance(first["unknown"], WalletNotFoundError)
+    assert ledger.submitted == ["1"] * 5
+    assert ledger.max_in_flight == 2
+
+    assert again[nyms[0]].did == first[nyms[0]].did
+    assert len(ledger.submitted) == 5
+
+
+def test_from_public_nyms_ledger_error():
+    """Test a failed ledger write is reported for its nym only."""
+    ledger = FakeLedger()
+    indy = registrar("nym", ledger_write_max_attempts=0)
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        nyms = await create_nyms(profile, 2)
+        ledger.reject = {nyms[1]}
+        return nyms, await indy.from_public_nyms(profile, nyms, didcomm=False)
+
+    nyms, results = asyncio.run(run())
+    assert results[nyms[0]].did == f"did:indy:indicio:test:{nyms[0]}"
+    assert isinstance(results[nyms[1]], LedgerTransactionError)
+
+
+def test_from_public_nyms_build_error():
+    """Test an error building one registration's request is reported for it only."""
+    ledger = FakeLedger()
+    indy = registrar("nym", ledger_write_max_attempts=0)
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        nyms = await create_nyms(profile, 2)
+        nym_request = indy._nym_request
+
+        def _nym_request(prepared):
+            if prepared.nym.did == nyms[1]:
+                raise VdrError(VdrErrorCode.INPUT, "Invalid request")
+            return nym_request(prepared)
+
+        indy._nym_request = _nym_request
+        return nyms, await indy.from_public_nyms(profile, nyms, didcomm=False)
+
+    nyms, results = asyncio.run(run())
+    assert results[nyms[0]].did == f"did:indy:indicio:test:{nyms[0]}"
+    assert isinstance(results[nyms[1]], VdrError)
+    assert ledger.submitted == ["1"]
+
+
+def test_from_public_nym_queues_transient_errors():
+    """Test writes timing out are queued for retry and rejected writes raise."""
+    ledger = FakeLedger()
+    indy = registrar("nym")
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        queued, rejected = await create_nyms(profile, 2)
+        ledger.unavailable = {queued}
+        ledger.reject = {rejected}
+        did = (await indy.from_public_nym(profile, queued, didcomm=False)).did
+        with pytest.raises(LedgerTransactionError):
+            await indy.from_public_nym(profile, rejected, didcomm=False)
+        return did, await indy.outbox.pending_writes(
+            profile, [did, f"did:indy:indicio:test:{rejected}"]
+        )
+
+    did, pending = asyncio.run(run())
+    assert list(pending) == [did]
+    assert pending[did].attempts == 1
+    assert pending[did].error == "Ledger request error"
+    assert ledger.submitted == []
+
+
+def test_from_public_nym_republishes_failed_writes():
+    """Test failed writes are kept and published again on the next registration."""
+    ledger = FakeLedger()
+    indy = registrar("nym")
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        rejected_nym, disabled_nym = await create_nyms(profile, 2)
+        ledger.reject = {rejected_nym}
+        with pytest.raises(LedgerTransactionError):
+            await indy.from_public_nym(profile, rejected_nym, didcomm=False)
+        ledger.unavailable = {disabled_nym}
+        indy.outbox.max_attempts = 0
+        with pytest.raises(LedgerTransactionError):
+            await indy.from_public_nym(profile, disabled_nym, didcomm=False)
+        async with profile.session() as session:
+            failed = await LedgerWriteRecord.query(
+                session, {"state": LedgerWriteRecord.STATE_FAILED}
+            )
+
+        ledger.reject = ledger.unavailable = set()
+        for nym in (rejected_nym, disabled_nym):
+            await indy.from_public_nym(profile, nym, didcomm=False)
+        async with profile.session() as session:
+            written = await LedgerWriteRecord.query(session, {})
+        return failed, written
+
+    failed, written = asyncio.run(run())
+    assert len(failed) == 2
+    assert [record.attempts for record in failed] == [1, 1]
+    assert {record.write_id for record in written} == {
+        record.write_id for record in failed
+    }
+    assert {record.state for record in written} == {
+        LedgerWriteRecord.STATE_COMPLETED
+    }
+    assert ledger.submitted == ["1", "1"]
+
+
+def test_namespace_per_profile():
+    """Test tenants may create DIDs on their own namespace and write mode."""
+    indy = registrar(
+        {"sovrin": "attrib"},
+        tenant_namespaces={"tenant-1": "sovrin", "tenant-two": "indicio:demo"},
+    )
+
+    def profile(**settings) -> SimpleNamespace:
+        return SimpleNamespace(settings=Settings(settings))
+
+    assert indy.namespace_for(profile(**{"wallet.id": "tenant-1"})) == "sovrin"
+    assert (
+        indy.namespace_for(profile(**{"wallet.id": "2", "wallet.name": "tenant-two"}))
+        == "indicio:demo"
+    )
+    assert indy.namespace_for(profile(**{"wallet.id": "3"})) == "indicio:test"
+    assert indy.namespace_for(profile()) == "indicio:test"
+    with pytest.raises(IndyRegistrarError):
+        registrar("both", tenant_namespaces=["sovrin"])
+
+    did_info = DIDInfo(
+        did=f"did:indy:sovrin:{NYM.did}",
+        verkey=NYM.verkey,
+        metadata={},
+        method=INDY,
+        key_type=ED25519,
+    )
+    ledger = FakeLedger()
+    asyncio.run(indy._publish(ledger, PreparedRegistration(NYM, did_info, {})))
+    assert ledger.submitted == ["100"]
+
+
+def test_write_requests_auto():
+    """Test auto mode requests the NYM write unless the ledger is legacy."""
+    auto = registrar("auto")
+
+    def types():
+        return [
+            json.loads(request.body)["operation"]["type"]
+            for request in auto._write_requests(prepared())
+        ]
+
+    assert types() == ["1"]
+    auto.nym_diddoc_support["indicio:test"] = False
+    assert types() == ["100"]
+
+
+class FakeReadLedger:
+    """Stand-in for BaseLedger answering GET_NYM and GET_ATTRIB reads."""
+
+    def __init__(self, nym_data: dict, attrib_data: dict | None = None):
+        self.nym_data = nym_data
+        self.attrib_data = attrib_data
+
+    async def txn_submit(self, txn, sign):
+        txn_type = json.loads(txn.body)["operation"]["type"]
+        data = self.nym_data if txn_type == "105" else self.attrib_data
+        return json.dumps(
+            {"op": "REPLY", "result": {"data": json.dumps(data) if data else None}}
+        )
+
+
+def test_read_doc_content():
+    """Test diddocContent is read from the NYM, falling back to the ATTRIB."""
+    content = {"service": [{"id": "#didcomm-0"}]}
+    from_nym = FakeReadLedger({"diddocContent": json.dumps(content)})
+    from_attrib = FakeReadLedger({"dest": NYM.did}, {"diddocContent": content})
+
+    assert asyncio.run(registrar("both").read_doc_content(from_nym, NYM.did)) == content
+    assert (
+        asyncio.run(registrar("both").read_doc_content(from_attrib, NYM.did)) == content
+    )
+    assert asyncio.run(registrar("nym").read_doc_content(from_attrib, NYM.did)) == {}
+
+
+def test_update_document():
+    """Test updates write once when the content differs and not at all otherwise."""
+    ledger = FakeLedger()
+    indy = registrar("both", ledger_write_max_attempts=0)
+    service = {
+        "id": "#didcomm-0",
+        "type": "did-communication",
+        "recipientKeys": ["#key-0"],
+        "serviceEndpoint": "https://agent.example",
+    }
+    moved = {**service, "serviceEndpoint": "https://moved.example"}
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        (nym,) = await create_nyms(profile, 1)
+        did = (await indy.from_public_nym(profile, nym, didcomm=False)).did
+        assert sorted(ledger.submitted) == ["1", "100"]
+
+        assert await indy.update_document(profile, did, services=[service]) == [
+            "service"
+        ]
+        assert len(ledger.submitted) == 4
+
+        assert await indy.update_document(profile, did, services=[service]) == []
+        assert len(ledger.submitted) == 4
+
+        assert await indy.update_document(profile, did, services=[moved]) == [
+            "service"
+        ]
+        assert sorted(ledger.submitted[4:]) == ["1", "100"]
+        assert await indy.read_doc_content(ledger, nym) == {"service": [moved]}
+        assert json.loads(ledger.attribs[nym]) == {
+            "diddocContent": {"service": [moved]}
+        }
+
+    asyncio.run(run())
+
+
+def test_update_document_both_stale_attrib():
+    """Test a stale ATTRIB copy is rewritten along with the NYM in both mode."""
+    ledger = FakeLedger()
+    indy = registrar("both", ledger_write_max_attempts=0)
+    service = {"id": "#didcomm-0", "serviceEndpoint": "https://agent.example"}
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        (nym,) = await create_nyms(profile, 1)
+        did = (await indy.from_public_nym(profile, nym, didcomm=False)).did
+        ledger.nyms[nym] = json.dumps({"service": [service]})
+
+        assert await indy.update_document(profile, did, services=[service]) == [
+            "service"
+        ]
+        assert sorted(ledger.submitted[2:]) == ["1", "100"]
+        assert json.loads(ledger.attribs[nym]) == {
+            "diddocContent": {"service": [service]}
+        }
+
+        assert await indy.update_document(profile, did, services=[service]) == []
+        assert len(ledger.submitted) == 4
+
+    asyncio.run(run())
+
+
+def test_update_document_attrib():
+    """Test content published as an ATTRIB is updated with one ATTRIB write."""
+    ledger = FakeLedger()
+    indy = registrar("auto", ledger_write_max_attempts=0)
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        (nym,) = await create_nyms(profile, 1)
+        did = (await indy.from_public_nym(profile, nym, didcomm=False)).did
+        ledger.attribs[nym] = json.dumps({"diddocContent": {"service": []}})
+
+        changed = await indy.update_document(
+            profile, did, verification_methods=[{"id": "#key-1"}]
+        )
+        assert changed == ["verificationMethod"]
+        assert ledger.submitted[1:] == ["100"]
+
+    asyncio.run(run())
+
+
+class FakeRouteManager:
+    """Stand-in for RouteManager returning routing info per mediation record."""
+
+    def __init__(self, routing: dict):
+        self.routing = routing
+        self.calls = 0
+
+    async def routing_info(self, profile, mediation_record):
+        self.calls += 1
+        return self.routing[mediation_record.mediation_id]
+
+
+class FakeProfile:
+    """Stand-in for Profile with settings and a route manager."""
+
+    def __init__(self, settings: dict, route_manager: FakeRouteManager):
+        self.settings = settings
+        self.route_manager = route_manager
+
+    def inject(self, cls):
+        return self.route_manager
+
+
+def test_prepare_didcomm_services():
+    """Test routing keys are de-duplicated and services memoized."""
+    route_manager = FakeRouteManager(
+        {
+            "m1": (["did:key:z1", "did:key:z2"], "https://mediator.example"),
+            "m2": (["did:key:z2", "did:key:z3"], None),
+        }
+    )
+    profile = FakeProfile({"default_endpoint": "https://agent.example"}, route_manager)
+    records = [SimpleNamespace(mediation_id="m1"), SimpleNamespace(mediation_id="m2")]
+    indy = registrar("both")
+
+    services = asyncio.run(indy.prepare_didcomm_services(profile, records))
+    assert services == [
+        {
+            "id": "#didcomm-0",
+            "type": "did-communication",
+            "recipientKeys": ["#key-0"],
+            "routingKeys": ["did:key:z1", "did:key:z2", "did:key:z3"],
+            "serviceEndpoint": "https://mediator.example",
+            "priority": 0,
+        }
+    ]
+    assert route_manager.calls == 2
+
+    services[0]["serviceEndpoint"] = "mutated"
+    again = asyncio.run(indy.prepare_didcomm_services(profile, records))
+    assert again[0]["serviceEndpoint"] == "https://mediator.example"
+    assert route_manager.calls == 2
+
+
+def test_prepare_didcomm_services_per_tenant_and_invalidated():
+    """Test memoized services are kept per wallet and dropped on mediation changes."""
+    route_manager = FakeRouteManager({"m1": (["did:key:z1"], None)})
+    settings = {"default_endpoint": "https://agent.example"}
+    base = FakeProfile(settings, route_manager)
+    tenant = FakeProfile({**settings, "wallet.id": "tenant"}, route_manager)
+    records = [SimpleNamespace(mediation_id="m1")]
+    indy = registrar("both")
+
+    async def run():
+        await indy.prepare_didcomm_services(base, records)
+        await indy.prepare_didcomm_services(tenant, records)
+        assert route_manager.calls == 2
+
+        route_manager.routing["m1"] = (["did:key:z2"], None)
+        event = Event("acapy::record::mediation::granted", {"mediation_id": "m1"})
+        assert MEDIATION_EVENT_PATTERN.match(event.topic)
+        await indy._on_mediation_event(base, event)
+        return await indy.prepare_didcomm_services(base, records)
+
+    services = asyncio.run(run())
+    assert route_manager.calls == 3
+    assert services[0]["routingKeys"] == ["did:key:z2"]
@@ -0,0 +1,140 @@
+"""Test did:indy admin routes."""
+
+import asyncio
+import json
+from unittest import mock
+
+from acapy_agent.admin.request_context import AdminRequestContext
+from acapy_agent.core.profile import Profile
+from acapy_agent.protocols.coordinate_mediation.v1_0.route_manager import (
+    RouteManager,
+)
+from acapy_agent.storage.error import StorageError
+from aiohttp import web
+import pytest
+
+from acapy_did_indy.outbox import LedgerWriteRecord
+from acapy_did_indy.registrar import IndyRegistrar
+from acapy_did_indy.routes import create_did_indy, create_did_indy_bulk
+
+from .test_registrar import FakeLedger, create_nyms, ledger_profile, registrar
+
+
+class FakeRequest(dict):
+    """Stand-in for an admin web.Request."""
+
+    def __init__(self, context: AdminRequestContext, body: dict, query: dict = None):
+        super().__init__(context=context)
+        self.body = body
+        self.query = query or {}
+
+    async def json(self) -> dict:
+        return self.body
+
+
+def bind_route_manager(profile: Profile):
+    """Bind a route manager with no mediation records."""
+    route_manager = mock.MagicMock(RouteManager, autospec=True)
+    route_manager.mediation_record_if_id = mock.AsyncMock(return_value=None)
+    profile.context.injector.bind_instance(RouteManager, route_manager)
+
+
+def test_create_did_indy_bulk():
+    """Test the bulk route reports the created DID or the error per nym."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        bind_route_manager(profile)
+        profile.context.injector.bind_instance(
+            IndyRegistrar, registrar("nym", ledger_write_max_attempts=0)
+        )
+        nyms = await create_nyms(profile, 2)
+        ledger.reject = {nyms[1]}
+        request = FakeRequest(
+            AdminRequestContext(profile),
+            {"nyms": [*nyms, "unknown"], "didcomm": False},
+        )
+        response = await create_did_indy_bulk(request)
+        return nyms, json.loads(response.body)
+
+    nyms, body = asyncio.run(run())
+    assert [result["nym"] for result in body["results"]] == [*nyms, "unknown"]
+    assert body["results"][0] == {
+        "nym": nyms[0],
+        "did": f"did:indy:indicio:test:{nyms[0]}",
+    }
+    assert "did" not in body["results"][1]
+    assert body["results"][1]["error"]
+    assert "Unknown DID" in body["results"][2]["error"]
+
+
+def test_create_did_indy_bulk_batch_error():
+    """Test an error failing the whole batch is reported and stored per nym."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile = await ledger_profile(ledger, {"endorser.author": True})
+        bind_route_manager(profile)
+        profile.context.injector.bind_instance(
+            IndyRegistrar, registrar("nym", ledger_write_max_attempts=0)
+        )
+        nyms = await create_nyms(profile, 2)
+        request = FakeRequest(
+            AdminRequestContext(profile), {"nyms": nyms, "didcomm": False}
+        )
+        response = await create_did_indy_bulk(request)
+        async with profile.session() as session:
+            writes = await LedgerWriteRecord.query(session)
+        return json.loads(response.body), writes
+
+    body, writes = asyncio.run(run())
+    for result in body["results"]:
+        assert "no endorser connection" in result["error"]
+    assert [write.state for write in writes] == [LedgerWriteRecord.STATE_FAILED] * 2
+    assert ledger.submitted == []
+
+
+def test_create_did_indy_bulk_storage_error():
+    """Test a failure outside any one nym is returned as an HTTP error."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        bind_route_manager(profile)
+        indy = registrar("nym", ledger_write_max_attempts=0)
+        profile.context.injector.bind_instance(IndyRegistrar, indy)
+        nyms = await create_nyms(profile, 1)
+        request = FakeRequest(
+            AdminRequestContext(profile), {"nyms": nyms, "didcomm": False}
+        )
+        with mock.patch.object(
+            indy.outbox, "pending_writes", side_effect=StorageError("unavailable")
+        ):
+            await create_did_indy_bulk(request)
+
+    with pytest.raises(web.HTTPInternalServerError):
+        asyncio.run(run())
+
+
+def test_create_did_indy_queued_write():
+    """Test a DID whose ledger write is queued for retry reports the write."""
+    ledger = FakeLedger()
+
+    async def run():
+        profile = await ledger_profile(ledger)
+        bind_route_manager(profile)
+        profile.context.injector.bind_instance(IndyRegistrar, registrar("nym"))
+        queued, written = await create_nyms(profile, 2)
+        ledger.unavailable = {queued}
+        context = AdminRequestContext(profile)
+        responses = [
+            await create_did_indy(FakeRequest(context, {"nym": nym, "didcomm": False}))
+            for nym in (queued, written)
+        ]
+        return queued, written, [json.loads(response.body) for response in responses]
+
+    queued, written, (pending, done) = asyncio.run(run())
+    assert pending["did"] == f"did:indy:indicio:test:{queued}"
+    assert pending["write_id"]
+    assert done == {"did": f"did:indy:indicio:test:{written}"}
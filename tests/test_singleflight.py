@@ -0,0 +1,62 @@
+"""Test single-flight call coalescing."""
+
+import asyncio
+
+from acapy_did_indy.singleflight import SingleFlight
+
+
+def test_coalesce():
+    """Test concurrent callers share one call."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"calls": calls}
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+        assert all(result == {"calls": 1} for result in results)
+        assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": 9}
+        await flight.do("key", fetch)
+
+    asyncio.run(run())
+    assert calls == 2
+
+
+def test_shared_error():
+    """Test every waiter sees the error raised by the shared call."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancel_waiter():
+    """Test cancelling one waiter leaves the shared call running."""
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"